@@ -0,0 +1,226 @@
+"""Benchmarks for the simulation job store under concurrent readers and writers.
+
+Simulates a number of RQ workers writing progress and results to the job store, while a
+number of REST server threads poll the scenario list and status, as a Dash frontend would.
+Each case runs for a fixed duration on a fresh database, in one of two modes:
+
+- ``pooled``: the :py:mod:`hpath_backend.db` functions, i.e. a reused connection per thread
+  with WAL journaling.
+- ``per-call``: a new connection per operation in the default rollback journal mode, as in
+  earlier versions of the job store.
+
+For each case and role (``reader`` or ``writer``), the following metrics are reported as
+JSON:
+
+- ``ops``, ``ops_per_s``: number of completed operations and their rate.
+- ``p50_ms``, ``p99_ms``, ``max_ms``: operation latencies.
+- ``locked``: number of operations failing with a "database is locked" error.
+
+Usage (from the repository root)::
+
+    python -m benchmarks.db_concurrency --readers 1 4 16 --writers 1 4 -o bench.json
+"""
+import argparse
+import concurrent.futures as cf
+import json
+import multiprocessing as mp
+import os
+import platform
+import sqlite3 as sql
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any
+
+import numpy as np
+
+from hpath_backend import db
+
+MODES = ('pooled', 'per-call')
+"""Database connection modes to benchmark."""
+
+RESULT_BYTES = 200_000
+"""Approximate size of the results JSON saved by each simulated writer."""
+
+
+def _query(mode: str, db_path: str, query: str, params: tuple = ()) -> None:
+    """Run a single query, on the thread's connection or on a new connection."""
+    if mode == 'pooled':
+        with db.connect() as conn:
+            conn.execute(query, params).fetchall()
+    else:
+        with sql.connect(db_path) as conn:
+            conn.execute(query, params).fetchall()
+
+
+def _read_op(mode: str, db_path: str, scenario_id: int) -> None:
+    """Poll the scenario list and the status of a scenario."""
+    _query(mode, db_path, db.SQL_LIST_SCENARIOS)
+    _query(mode, db_path, db.SQL_SCENARIO_STATUS, (scenario_id, ))
+
+
+def _write_op(mode: str, db_path: str, scenario_id: int, result: bytes) -> None:
+    """Write the progress and interim result of a scenario."""
+    if mode == 'pooled':
+        with db.connect() as conn:
+            conn.execute(db.SQL_UPDATE_PROGRESS, (1, scenario_id))
+            conn.execute(db.SQL_SAVE_RESULT, (result, scenario_id))
+    else:
+        with sql.connect(db_path) as conn:
+            conn.execute(db.SQL_UPDATE_PROGRESS, (1, scenario_id))
+            conn.execute(db.SQL_SAVE_RESULT, (result, scenario_id))
+
+
+def _timed_loop(role: str, mode: str, db_path: str, scenario_ids: list[int],
+                duration: float, seed: int) -> dict[str, Any]:
+    """Repeat read or write operations for ``duration`` seconds and return the latencies."""
+    rng = np.random.default_rng(seed)
+    result = db.compress_result(json.dumps({'x': rng.random(RESULT_BYTES // 20).tolist()}))
+    latencies: list[float] = []
+    locked = 0
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        scenario_id = int(rng.choice(scenario_ids))
+        start = time.perf_counter()
+        try:
+            if role == 'reader':
+                _read_op(mode, db_path, scenario_id)
+            else:
+                _write_op(mode, db_path, scenario_id, result)
+        except sql.OperationalError as exc:
+            if 'locked' not in str(exc):
+                raise
+            locked += 1
+            continue
+        latencies.append(time.perf_counter() - start)
+    return {'latencies': latencies, 'locked': locked}
+
+
+def run_process(role: str, mode: str, db_path: str, scenario_ids: list[int],
+                duration: float, num_threads: int, seed: int) -> dict[str, Any]:
+    """Run ``num_threads`` reader or writer threads in this process.  Intended to be run in
+    a fresh subprocess."""
+    db.DB_PATH = db_path
+    results: list[dict[str, Any]] = []
+
+    def target(idx: int) -> None:
+        try:
+            results.append(_timed_loop(role, mode, db_path, scenario_ids, duration, seed + idx))
+        finally:
+            db.disconnect()
+
+    threads = [threading.Thread(target=target, args=(idx, )) for idx in range(num_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {
+        'latencies': [lat for res in results for lat in res['latencies']],
+        'locked': sum(res['locked'] for res in results)
+    }
+
+
+def summarise(latencies: list[float], locked: int, duration: float) -> dict[str, Any]:
+    """Summarise the operation latencies of a role."""
+    lat_ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        'ops': len(latencies),
+        'ops_per_s': len(latencies) / duration,
+        'p50_ms': float(np.percentile(lat_ms, 50)),
+        'p99_ms': float(np.percentile(lat_ms, 99)),
+        'max_ms': float(lat_ms.max()),
+        'locked': locked
+    }
+
+
+def run_case(mode: str, num_readers: int, num_writers: int, num_scenarios: int,
+             duration: float, seed: int) -> dict[str, Any]:
+    """Run a single benchmark case on a fresh database and return its metrics.
+
+    Readers run as threads of a single process, as in a threaded REST server.  Writers run
+    as separate processes, as RQ workers do.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'hpath.db')
+        db.DB_PATH = db_path
+        db.init()
+        with db.connect() as conn:
+            scenario_ids = [
+                db.submit_scenario(f'scenario {idx}', None, 10, 'config.xlsx',
+                                   str(idx).encode(), cur=conn.cursor())
+                for idx in range(num_scenarios)
+            ]
+            if mode == 'per-call':
+                conn.execute('PRAGMA journal_mode = DELETE')
+        db.disconnect()
+
+        ctx = mp.get_context('spawn')
+        with cf.ProcessPoolExecutor(max_workers=num_writers + 1, mp_context=ctx) as executor:
+            reader = executor.submit(run_process, 'reader', mode, db_path, scenario_ids,
+                                     duration, num_readers, seed)
+            writers = [executor.submit(run_process, 'writer', mode, db_path, scenario_ids,
+                                       duration, 1, seed + 1000*(idx + 1))
+                       for idx in range(num_writers)]
+            reads = reader.result()
+            writes = [future.result() for future in writers]
+
+    return {
+        'mode': mode,
+        'readers': num_readers,
+        'writers': num_writers,
+        'reader': summarise(reads['latencies'], reads['locked'], duration),
+        'writer': summarise([lat for res in writes for lat in res['latencies']],
+                            sum(res['locked'] for res in writes), duration)
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the benchmark matrix and write the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n', maxsplit=1)[0])
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES),
+                        help='Connection modes to benchmark (default: all).')
+    parser.add_argument('--readers', type=int, nargs='+', default=[1, 4, 16],
+                        help='Numbers of reader threads (default: 1 4 16).')
+    parser.add_argument('--writers', type=int, nargs='+', default=[1, 4],
+                        help='Numbers of writer processes (default: 1 4).')
+    parser.add_argument('--scenarios', type=int, default=50,
+                        help='Number of scenarios in the database (default: 50).')
+    parser.add_argument('--duration', type=float, default=5.0,
+                        help='Duration of each case in seconds (default: 5).')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1).')
+    parser.add_argument('-o', '--output', help='Output file (default: stdout).')
+    args = parser.parse_args(argv)
+
+    results = []
+    for num_writers in args.writers:
+        for num_readers in args.readers:
+            for mode in args.modes:
+                result = run_case(mode, num_readers, num_writers, args.scenarios,
+                                  args.duration, args.seed)
+                print(f"{mode} readers={num_readers} writers={num_writers}: "
+                      f"{result['reader']['ops_per_s']:,.0f} reads/s "
+                      f"(p99 {result['reader']['p99_ms']:,.1f} ms), "
+                      f"{result['writer']['ops_per_s']:,.0f} writes/s "
+                      f"(p99 {result['writer']['p99_ms']:,.1f} ms), "
+                      f"{result['reader']['locked'] + result['writer']['locked']} locked",
+                      file=sys.stderr)
+                results.append(result)
+
+    output = {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'sqlite': sql.sqlite_version,
+        'platform': platform.platform(),
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(output, file, indent=2)
+    else:
+        json.dump(output, sys.stdout, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+"""Load test for the REST server.
+
+Starts the REST server on a fresh database populated with synthetic scenarios, then
+measures the request rate of the dashboard polling endpoints under a number of concurrent
+clients.  The server is run in one of two modes:
+
+- ``dev``: Flask's built-in development server, as run by ``python -m
+  hpath_backend.server.restful`` (without the debug reloader).
+- ``gunicorn``: the production server, as run by ``python -m hpath_backend.server.wsgi``.
+
+For each case, the following metrics are reported as JSON:
+
+- ``requests``, ``requests_per_s``: number of successful requests and their rate.
+- ``p50_ms``, ``p99_ms``: request latencies.
+- ``errors``: number of failed requests.
+
+Usage (from the repository root)::
+
+    python -m benchmarks.rest_load --clients 1 8 32 -o bench.json
+"""
+import argparse
+import concurrent.futures as cf
+import http.client
+import json
+import multiprocessing as mp
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any
+
+import numpy as np
+
+from hpath_backend import db
+
+MODES = ('dev', 'gunicorn')
+"""REST server modes to benchmark."""
+
+ENDPOINTS = ('/scenarios/', '/scenarios/{scenario_id}/results/')
+"""Endpoints to benchmark.  ``{scenario_id}`` is replaced by a random scenario ID."""
+
+RESULT_BYTES = 200_000
+"""Approximate size of the results JSON of each synthetic scenario."""
+
+SERVER_CODE = {
+    'dev': 'from hpath_backend.server.restful import app; '
+           'db.init(); app.run(host="127.0.0.1", port={port})',
+    'gunicorn': 'from hpath_backend.server.wsgi import main; '
+                'main(["--bind", "127.0.0.1:{port}", "--workers", "{workers}"])'
+}
+"""Code run in a subprocess to start the server in each mode, after setting ``DB_PATH``."""
+
+
+def populate(db_path: str, num_scenarios: int, seed: int) -> list[int]:
+    """Initialise a database with synthetic scenarios and results."""
+    db.DB_PATH = db_path
+    db.init()
+    rng = np.random.default_rng(seed)
+    with db.connect() as conn:
+        scenario_ids = [
+            db.submit_scenario(f'scenario {idx}', None, 10, 'config.xlsx',
+                               str(idx).encode(), cur=conn.cursor())
+            for idx in range(num_scenarios)
+        ]
+    for scenario_id in scenario_ids:
+        db.save_result(scenario_id,
+                       json.dumps({'x': rng.random(RESULT_BYTES // 20).tolist()}))
+    db.disconnect()
+    return scenario_ids
+
+
+def free_port() -> int:
+    """Return a free TCP port on localhost."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(mode: str, db_path: str, port: int, workers: int) -> subprocess.Popen:
+    """Start the REST server in a subprocess and wait until it accepts requests."""
+    code = f'from hpath_backend import db; db.DB_PATH = {db_path!r}; ' \
+        + SERVER_CODE[mode].format(port=port, workers=workers)
+    proc = subprocess.Popen([sys.executable, '-c', code], stdout=subprocess.DEVNULL,
+                            stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/')
+            conn.getresponse().read()
+            return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError(f'{mode} server did not start.')
+
+
+def run_client(port: int, endpoint: str, scenario_ids: list[int], duration: float,
+               seed: int) -> dict[str, Any]:
+    """Send requests to an endpoint for ``duration`` seconds and return the latencies."""
+    rng = np.random.default_rng(seed)
+    latencies: list[float] = []
+    errors = 0
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        path = endpoint.format(scenario_id=int(rng.choice(scenario_ids)))
+        start = time.perf_counter()
+        try:
+            conn.request('GET', path)
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors += 1
+                continue
+            if response.will_close:
+                conn.close()
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+    return {'latencies': latencies, 'errors': errors}
+
+
+def run_case(port: int, endpoint: str, scenario_ids: list[int], num_clients: int,
+             duration: float, seed: int) -> dict[str, Any]:
+    """Run ``num_clients`` client processes against an endpoint and return the metrics."""
+    with cf.ProcessPoolExecutor(max_workers=num_clients,
+                                mp_context=mp.get_context('spawn')) as executor:
+        futures = [executor.submit(run_client, port, endpoint, scenario_ids, duration,
+                                   seed + idx)
+                   for idx in range(num_clients)]
+        results = [future.result() for future in futures]
+    latencies = np.array([lat for res in results for lat in res['latencies']]) * 1000
+    return {
+        'endpoint': endpoint,
+        'clients': num_clients,
+        'requests': len(latencies),
+        'requests_per_s': len(latencies) / duration,
+        'p50_ms': float(np.percentile(latencies, 50)) if len(latencies) else None,
+        'p99_ms': float(np.percentile(latencies, 99)) if len(latencies) else None,
+        'errors': sum(res['errors'] for res in results)
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the benchmark matrix and write the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n', maxsplit=1)[0])
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES),
+                        help='Server modes to benchmark (default: all).')
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 8, 32],
+                        help='Numbers of concurrent clients (default: 1 8 32).')
+    parser.add_argument('--workers', type=int, default=2 * (os.cpu_count() or 1) + 1,
+                        help='Number of gunicorn worker processes (default: 2*CPUs+1).')
+    parser.add_argument('--scenarios', type=int, default=50,
+                        help='Number of scenarios in the database (default: 50).')
+    parser.add_argument('--duration', type=float, default=5.0,
+                        help='Duration of each case in seconds (default: 5).')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1).')
+    parser.add_argument('-o', '--output', help='Output file (default: stdout).')
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'hpath.db')
+        scenario_ids = populate(db_path, args.scenarios, args.seed)
+        for mode in args.modes:
+            port = free_port()
+            server = start_server(mode, db_path, port, args.workers)
+            try:
+                for endpoint in ENDPOINTS:
+                    for num_clients in args.clients:
+                        result = {'mode': mode, **run_case(port, endpoint, scenario_ids,
+                                                           num_clients, args.duration,
+                                                           args.seed)}
+                        print(f"{mode} {endpoint} clients={num_clients}: "
+                              f"{result['requests_per_s']:,.0f} requests/s, "
+                              f"{result['errors']} errors", file=sys.stderr)
+                        results.append(result)
+            finally:
+                server.terminate()
+                server.wait()
+
+    output = {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'workers': args.workers,
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(output, file, indent=2)
+    else:
+        json.dump(output, sys.stdout, indent=2)
+
+
+if __name__ == '__main__':
+    main()
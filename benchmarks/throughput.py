@@ -0,0 +1,151 @@
+"""End-to-end simulation throughput benchmarks.
+
+Runs the simulation model on ``test_wips/config.xlsx`` (or another workbook) for a matrix
+of synthetic scenarios, scaling the arrival rates of both pathways and varying the
+simulation horizon.  Each case runs in a fresh subprocess so that peak memory usage is
+measured per case.
+
+For each case, the following metrics are reported as JSON:
+
+- ``events``, ``events_per_s``: number of salabim event-list steps and their rate.
+- ``specimens``, ``specimens_per_s``: number of specimen arrivals and their rate.
+- ``setup_s``, ``run_s``: model construction and simulation wall times.
+- ``report_s``, ``report_json_bytes``: :py:class:`~hpath_backend.kpis.Report` build time
+  and JSON size.
+- ``peak_rss_mb``: peak resident set size of the subprocess.
+- ``profile``: per-process counters (see :py:mod:`hpath_backend.profiling`), only if run
+  with ``--profile``.  Note that profiling slows down the simulation.
+
+Usage (from the repository root)::
+
+    python -m benchmarks.throughput --scales 1 2 5 10 --weeks 1 4 12 -o bench.json
+"""
+import argparse
+import concurrent.futures as cf
+import json
+import multiprocessing as mp
+import platform
+import resource
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any
+
+import salabim as sim
+
+from hpath_backend.config import Config
+from hpath_backend.excel import WorkbookReader
+from hpath_backend.kpis import Report
+from hpath_backend.model import Model
+
+DEFAULT_CONFIG = 'test_wips/config.xlsx'
+"""Default workbook used for benchmarking."""
+
+
+def scaled_config(config_path: str, scale: float, weeks: float) -> Config:
+    """Load a config from a workbook, multiplying all arrival rates by ``scale`` and setting
+    the simulation horizon to ``weeks`` weeks."""
+    config = Config.from_workbook(WorkbookReader(config_path), sim_hours=weeks*168, num_reps=1)
+    for schedule in (config.arrival_schedules.cancer, config.arrival_schedules.noncancer):
+        schedule.rates = [scale * rate for rate in schedule.rates]
+    return config
+
+
+def run_case(config_path: str, scale: float, weeks: float, seed: int,
+             profile: bool = False) -> dict[str, Any]:
+    """Run a single benchmark case and return its metrics.  Intended to be run in a fresh
+    subprocess, as the peak RSS of the current process is reported."""
+    config = scaled_config(config_path, scale, weeks)
+
+    start = time.perf_counter()
+    mdl = Model(config, random_seed=seed, profile=profile)
+    setup_s = time.perf_counter() - start
+
+    # Count event-list steps by wrapping the model's step() method
+    num_events = 0
+    step = mdl.step
+
+    def counting_step() -> None:
+        nonlocal num_events
+        num_events += 1
+        step()
+
+    mdl.step = counting_step
+
+    start = time.perf_counter()
+    mdl.run()
+    run_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    report_json = Report.from_model(mdl).model_dump_json()
+    report_s = time.perf_counter() - start
+
+    store = mdl.specimen_data
+    num_specimens = int((~store.mock[:store.num_rows]).sum())
+
+    result = {
+        'scale': scale,
+        'weeks': weeks,
+        'seed': seed,
+        'events': num_events,
+        'events_per_s': num_events / run_s,
+        'specimens': num_specimens,
+        'specimens_per_s': num_specimens / run_s,
+        'setup_s': setup_s,
+        'run_s': run_s,
+        'report_s': report_s,
+        'report_json_bytes': len(report_json.encode('utf-8')),
+        # ru_maxrss is in kilobytes on Linux, bytes on macOS
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        / (1024**2 if sys.platform == 'darwin' else 1024)
+    }
+    if profile:
+        result['profile'] = mdl.profiler.profile().model_dump()
+    return result
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the benchmark matrix and write the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n', maxsplit=1)[0])
+    parser.add_argument('--config', default=DEFAULT_CONFIG,
+                        help=f'Workbook to benchmark (default: {DEFAULT_CONFIG}).')
+    parser.add_argument('--scales', type=float, nargs='+', default=[1, 2, 5, 10],
+                        help='Arrival rate multipliers (default: 1 2 5 10).')
+    parser.add_argument('--weeks', type=float, nargs='+', default=[1, 4, 12],
+                        help='Simulation horizons in weeks (default: 1 4 12).')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1).')
+    parser.add_argument('--profile', action='store_true',
+                        help='Include per-process profiling counters in the output.')
+    parser.add_argument('-o', '--output', help='Output file (default: stdout).')
+    args = parser.parse_args(argv)
+
+    results = []
+    for weeks in args.weeks:
+        for scale in args.scales:
+            # Fresh subprocess per case, so that peak RSS is not shared between cases
+            with cf.ProcessPoolExecutor(max_workers=1,
+                                        mp_context=mp.get_context('spawn')) as executor:
+                result = executor.submit(run_case, args.config, scale, weeks, args.seed,
+                                         args.profile).result()
+            print(f"scale={scale:g} weeks={weeks:g}: {result['events_per_s']:,.0f} events/s, "
+                  f"{result['specimens_per_s']:,.1f} specimens/s, "
+                  f"{result['peak_rss_mb']:,.0f} MB peak RSS", file=sys.stderr)
+            results.append(result)
+
+    output = {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'salabim': sim.__version__,
+        'platform': platform.platform(),
+        'config': args.config,
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(output, file, indent=2)
+    else:
+        json.dump(output, sys.stdout, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -10,12 +10,54 @@ REDIS_PORT = 6379
 PORT = 5000
 """Port to host this server on (internal port)."""
 
+SERVER_WORKERS = None
+"""Number of worker processes of the production REST server.  If None, use twice the
+number of available CPU cores, plus one."""
+
+SERVER_THREADS = 4
+"""Number of request threads per worker process of the production REST server."""
+
+SSE_MAX_STREAMS = 2
+"""Maximum number of open progress event streams (``/scenarios/events``) per REST server
+process.  Each open stream holds a request thread, so this should be less than
+``SERVER_THREADS``; further clients get ``503 Service Unavailable`` and should poll."""
+
+SSE_MAX_DURATION = 60.0
+"""Time in seconds after which a progress event stream is ended, freeing its request
+thread.  Clients reconnect automatically."""
+
 DB_PATH = "/db/hpath.db"
 """Path to the simulation job store, a SQLite database."""
 
+DB_BUSY_TIMEOUT = 30.0
+"""Time in seconds to wait for a lock on the simulation job store before raising a
+"database is locked" error."""
+
 # During development, we may wish to start with a clean database upon
 # every launch.  For production, set this to True.
 # DB_PERSISTENCE = False
 DB_PERSISTENCE = True
 """If false, builds a new empty database upon app launch. If true, use
 the existing database if found."""
+
+SIM_MAX_WORKERS = None
+"""Maximum number of worker processes used to run the replications of a single scenario.
+If None, use all available CPU cores."""
+
+CONFIG_CACHE_SIZE = 256
+"""Maximum number of parsed configs kept in the config cache of the simulation job store,
+keyed by the SHA-256 hash of the uploaded workbook.  The least recently used configs are
+evicted first."""
+
+PROGRESS_MIN_INTERVAL = 5.0
+"""Minimum interval in seconds between progress updates written to the database by a
+running simulation."""
+
+SIM_FANOUT = False
+"""If true, enqueue the replications of each scenario as separate jobs, with a dependent job
+combining their results, so that a scenario can be spread across multiple workers. If false,
+each scenario is a single job running its replications in a local process pool."""
+
+SIM_PROFILE = False
+"""If true, run simulations with profiling enabled and include per-process counters in
+the ``profile`` section of each result (see :py:mod:`hpath_backend.profiling`)."""
@@ -666,11 +666,12 @@ class Config(pyd.BaseModel):
     @staticmethod
     def from_workbook(
         # path: os.PathLike,
-        wbook: xl.Workbook,
+        wbook: xl.Workbook | xlh.WorkbookReader,
         sim_hours: float,
         num_reps: int,
     ) -> 'Config':
-        """Load a config from an Excel workbook."""
+        """Load a config from an Excel workbook.  Use a
+        :py:class:`~hpath_backend.excel.WorkbookReader` for faster loading."""
         # wbook = xl.load_workbook(path, data_only=True)
 
         # ARRIVAL SCHEDULES
@@ -1,22 +1,98 @@
 """Defines SQLite commands and initialises the database for the histopathology simulator
 backend."""
+import codecs
+import gzip
+import hashlib
+import json
 import os
 import sqlite3 as sql
+import threading
+import time
+import weakref
+import zlib
+from collections.abc import Iterator
 from datetime import datetime
+from typing import Any, Callable, Self
 
 import pandas as pd
 
-from conf import DB_PATH, DB_PERSISTENCE
+from conf import (CONFIG_CACHE_SIZE, DB_BUSY_TIMEOUT, DB_PATH, DB_PERSISTENCE,
+                  PROGRESS_MIN_INTERVAL)
 from .types import HPathConfigParams, HPathSharedParams
 
 # NOTE: ALWAYS USE TRANSACTIONS WHEN UPDATING DATABASE
 
 SQL_PERSIST = " IF NOT EXISTS" if DB_PERSISTENCE else ""
 
+RESULTS_COMPRESSLEVEL = 6
+"""gzip compression level for simulation results stored in the database."""
+
+RESULTS_CHUNK_SIZE = 65536
+"""Size in bytes of the compressed chunks decompressed at a time when streaming results."""
+
+SQL_CACHED_STATEMENTS = 256
+"""Number of prepared statements cached by each database connection."""
+
+SQL_PRAGMAS = """\
+PRAGMA journal_mode = WAL;
+PRAGMA synchronous = NORMAL;
+"""
+"""SQLite commands run on each new database connection.  In WAL mode, readers do not block
+writers and vice versa, so polling the job store does not stall the simulation workers.
+With ``synchronous = NORMAL``, commits are durable except on power loss."""
+
+_local = threading.local()
+
+
+class _Connection(sql.Connection):
+    """Database connection supporting weak references, so that the open connections of all
+    threads can be tracked across forks."""
+
+
+_connections: 'weakref.WeakSet[_Connection]' = weakref.WeakSet()
+"""Open database connections of this process, across all threads."""
+
+_fork_connections: list[_Connection] = []
+"""Connections referenced while forking (see :py:func:`_before_fork`)."""
+
+_inherited_connections: list[_Connection] = []
+"""Connections inherited from the parent process.  SQLite connections must not be used or
+closed across a fork, so these are kept referenced and never finalised."""
+
+
+def _before_fork() -> None:
+    """Reference the open connections of all threads, as the thread-local storage of other
+    threads is cleared in the child process before :py:func:`_after_fork_in_child` runs."""
+    _fork_connections[:] = _connections
+
+
+def _after_fork_in_parent() -> None:
+    """Drop the references taken by :py:func:`_before_fork`."""
+    _fork_connections.clear()
+
+
+def _after_fork_in_child() -> None:
+    """Forget the connections inherited from the parent process without closing them, so that
+    :py:func:`connect` opens new connections in the child process."""
+    global _local  # pylint: disable=global-statement
+    _inherited_connections.extend(_fork_connections)
+    _fork_connections.clear()
+    _connections.clear()
+    _local = threading.local()
+
+
+os.register_at_fork(before=_before_fork, after_in_parent=_after_fork_in_parent,
+                    after_in_child=_after_fork_in_child)
+
 SQL_INIT = f"""\
 BEGIN TRANSACTION;
+{"DROP TABLE IF EXISTS results;" if not DB_PERSISTENCE else ""}
+{"DROP TABLE IF EXISTS analysis_results;" if not DB_PERSISTENCE else ""}
 {"DROP TABLE IF EXISTS analyses;" if not DB_PERSISTENCE else ""}
 {"DROP TABLE IF EXISTS scenarios;" if not DB_PERSISTENCE else ""}
+{"DROP TABLE IF EXISTS files;" if not DB_PERSISTENCE else ""}
+{"DROP TABLE IF EXISTS config_cache;" if not DB_PERSISTENCE else ""}
+{"DROP TABLE IF EXISTS submissions;" if not DB_PERSISTENCE else ""}
 CREATE TABLE{SQL_PERSIST} "analyses" (
         "analysis_id"    INTEGER,
         "analysis_name"  TEXT NOT NULL,
@@ -30,16 +106,67 @@ CREATE TABLE{SQL_PERSIST} "scenarios" (
         "completed"     REAL,
         "num_reps"      INTEGER NOT NULL,
         "done_reps"     INTEGER NOT NULL DEFAULT 0,
-        "results"       TEXT,
         "file_name"     TEXT,
-        "file"  BLOB,
+        "file_hash"     TEXT,
+        "error" TEXT,
         FOREIGN KEY("analysis_id") REFERENCES "analyses"("analysis_id"),
+        FOREIGN KEY("file_hash") REFERENCES "files"("file_hash"),
         PRIMARY KEY("scenario_id" AUTOINCREMENT)
 );
+CREATE TABLE{SQL_PERSIST} "files" (
+        "file_hash"     TEXT,
+        "file"  BLOB NOT NULL,
+        PRIMARY KEY("file_hash")
+);
+CREATE TABLE{SQL_PERSIST} "results" (
+        "scenario_id"   INTEGER,
+        "results"       BLOB,
+        FOREIGN KEY("scenario_id") REFERENCES "scenarios"("scenario_id"),
+        PRIMARY KEY("scenario_id")
+);
+CREATE TABLE{SQL_PERSIST} "analysis_results" (
+        "analysis_id"   INTEGER,
+        "results"       BLOB,
+        FOREIGN KEY("analysis_id") REFERENCES "analyses"("analysis_id"),
+        PRIMARY KEY("analysis_id")
+);
+CREATE TABLE{SQL_PERSIST} "config_cache" (
+        "file_hash"     TEXT,
+        "config"        TEXT NOT NULL,
+        "last_used"     REAL NOT NULL,
+        PRIMARY KEY("file_hash")
+);
+CREATE TABLE{SQL_PERSIST} "submissions" (
+        "submission_id" INTEGER,
+        "created"       REAL,
+        "status"        TEXT NOT NULL DEFAULT 'queued',
+        "upload"        BLOB,
+        "error" TEXT,
+        "analysis_id"   INTEGER,
+        "scenario_ids"  TEXT,
+        FOREIGN KEY("analysis_id") REFERENCES "analyses"("analysis_id"),
+        PRIMARY KEY("submission_id" AUTOINCREMENT)
+);
 DELETE FROM sqlite_sequence;
 COMMIT;
 """  # Generated from sqlitebrowser
-"""SQLite command for initialising the database."""
+"""SQLite command for initialising the database.  Uploaded files and simulation results
+are kept out of the ``scenarios`` table, so that listing and status queries only read small
+rows.  Files are stored once per SHA-256 hash of their contents, and results are stored as
+gzip-compressed JSON, as are the aggregated results of multi-scenario analyses.  Parsed
+configs are cached by the same hash.  Raw uploads are kept in
+the ``submissions`` table until parsed."""
+
+SQL_MIGRATE_SIDE_TABLES = """\
+BEGIN TRANSACTION;
+ALTER TABLE scenarios ADD COLUMN file_hash TEXT REFERENCES files(file_hash);
+INSERT OR REPLACE INTO results(scenario_id, results)
+    SELECT scenario_id, results FROM scenarios WHERE results IS NOT NULL;
+ALTER TABLE scenarios DROP COLUMN results;
+COMMIT;
+"""
+"""SQLite command for moving results out of a ``scenarios`` table created by an older
+version of the app.  Files are moved separately, as they must be hashed in Python."""
 
 SQL_LIST_SCENARIOS = """\
 SELECT
@@ -51,22 +178,134 @@ SELECT
     completed,
     num_reps,
     done_reps,
+    error,
     file_name
 FROM scenarios
 LEFT JOIN analyses ON scenarios.analysis_id = analyses.analysis_id
 """
 """SQLite command for listing the scenarios."""
 
+_SQL_ANALYSES = """\
+SELECT
+    analysis_id,
+    analysis_name,
+    COUNT(scenario_id) AS num_scenarios,
+    COUNT(completed) AS num_completed,
+    MIN(created) AS created,
+    CASE WHEN COUNT(completed) = COUNT(scenario_id) THEN MAX(completed) END AS completed,
+    SUM(num_reps) AS num_reps,
+    SUM(done_reps) AS done_reps,
+    COUNT(error) AS num_failed
+FROM analyses
+LEFT JOIN scenarios USING(analysis_id)
+{where}
+GROUP BY analysis_id
+"""
+
+SQL_LIST_ANALYSES = _SQL_ANALYSES.format(where='')
+"""SQLite command for listing the multi-scenario analyses and their progress."""
+
+SQL_ANALYSIS_STATUS = _SQL_ANALYSES.format(where='WHERE analysis_id = ?')
+"""SQLite command for fetching a single multi-scenario analysis's progress."""
+
+SQL_SCENARIO_STATUS = """\
+SELECT
+    scenario_id,
+    scenario_name,
+    analysis_id,
+    completed,
+    num_reps,
+    done_reps,
+    error
+FROM scenarios
+WHERE scenario_id = ?
+"""
+"""SQLite command for fetching a single scenario's status."""
+
+SQL_SCENARIO_PROGRESS = """\
+SELECT
+    scenario_id,
+    analysis_id,
+    num_reps,
+    done_reps,
+    completed,
+    error
+FROM scenarios
+WHERE scenario_id = ?
+"""
+"""SQLite command for fetching the progress fields of a single scenario, as published in
+progress events."""
+
+SQL_RUNNING_PROGRESS = """\
+SELECT
+    scenario_id,
+    analysis_id,
+    num_reps,
+    done_reps,
+    completed,
+    error
+FROM scenarios
+WHERE completed IS NULL AND error IS NULL
+"""
+"""SQLite command for fetching the progress fields of all running (or queued) scenarios."""
+
 SQL_SCENARIO_RESULTS = """\
 SELECT
     scenario_id,
     scenario_name,
     analysis_id,
+    completed,
+    num_reps,
+    done_reps,
     results
 FROM scenarios
+LEFT JOIN results USING(scenario_id)
+WHERE scenario_id = ?
+"""
+"""SQLite command for fetching a single scenario's status and compressed result."""
+
+SQL_SCENARIO_REPORT = """\
+SELECT results
+FROM results
 WHERE scenario_id = ?
 """
-"""SQLite command for fetching a single scenario's result."""
+"""SQLite command for fetching a single scenario's compressed result only."""
+
+SQL_ANALYSIS_SCENARIO_RESULTS = """\
+SELECT
+    scenario_id,
+    results
+FROM scenarios
+JOIN results USING(scenario_id)
+WHERE analysis_id = ?
+ORDER BY scenario_id
+"""
+"""SQLite command for fetching the compressed results of all scenarios in a multi-scenario
+analysis."""
+
+SQL_ANALYSIS_RESULT = """\
+SELECT results
+FROM analysis_results
+WHERE analysis_id = ?
+"""
+"""SQLite command for fetching a multi-scenario analysis's compressed aggregated results."""
+
+SQL_SAVE_ANALYSIS_RESULT = """\
+INSERT OR REPLACE INTO analysis_results(results, analysis_id)
+VALUES(?,?)
+"""
+"""SQLite command for saving the aggregated results of a multi-scenario analysis.  Results
+must be compressed using :py:func:`compress_result`."""
+
+SQL_ANALYSIS_COMPLETED = """\
+SELECT analysis_id
+FROM scenarios
+WHERE analysis_id = (SELECT analysis_id FROM scenarios WHERE scenario_id = ?)
+GROUP BY analysis_id
+HAVING COUNT(completed) = COUNT(*)
+"""
+"""SQLite command returning the analysis ID of a scenario if all scenarios in the analysis
+are completed."""
 
 SQL_INSERT_ANALYSIS = """\
 INSERT INTO analyses(analysis_name)
@@ -74,38 +313,176 @@ VALUES(?)
 """
 """SQLite command for creating a new multi-scenario analysis."""
 
+SQL_INSERT_FILE = """\
+INSERT OR IGNORE INTO files(file_hash, file)
+VALUES(?,?)
+"""
+"""SQLite command for storing an uploaded file, unless a file with the same hash is
+already stored."""
+
 SQL_INSERT_SCENARIO = """\
-INSERT INTO scenarios(scenario_name, analysis_id, created, num_reps, file_name, file)
+INSERT INTO scenarios(scenario_name, analysis_id, created, num_reps, file_name, file_hash)
 VALUES(?,?,?,?,?,?)
 """
 """SQLite command for creating a new simulation scenario."""
 
 SQL_UPDATE_PROGRESS = """\
 UPDATE scenarios
-SET done_reps = num_reps
+SET done_reps = done_reps + ?
 WHERE scenario_id = ?
 """
 """SQLite command for incrementing the progress counter."""
 
 SQL_SAVE_RESULT = """\
+INSERT OR REPLACE INTO results(results, scenario_id)
+VALUES(?,?)
+"""
+"""SQLite command for saving final or partially aggregated simulation results to
+database.  Results must be compressed using :py:func:`compress_result`."""
+
+SQL_SET_COMPLETED = """\
 UPDATE scenarios
-SET
-    completed = ?,
-    results = ?
+SET completed = ?
 WHERE scenario_id = ?
 """
-"""SQLite command for saving simulation results to database."""
+"""SQLite command for marking a scenario as completed."""
+
+SQL_SET_SCENARIO_ERROR = """\
+UPDATE scenarios
+SET error = ?
+WHERE scenario_id = ?
+"""
+"""SQLite command for recording the error of a failed scenario simulation."""
+
+SUBMISSION_STATUSES = ('queued', 'parsing', 'submitted', 'failed')
+"""Possible values of the ``status`` field of a submission.  Submissions are ``queued`` until
+picked up by a worker, then ``parsing`` until their scenarios are ``submitted`` to the
+simulation queue, or until they have ``failed`` with an error."""
+
+SQL_INSERT_SUBMISSION = """\
+INSERT INTO submissions(created, upload)
+VALUES(?,?)
+"""
+"""SQLite command for storing a raw upload to be parsed by a worker."""
+
+SQL_SUBMISSION_UPLOAD = """\
+SELECT upload
+FROM submissions
+WHERE submission_id = ?
+"""
+"""SQLite command for fetching the raw upload of a submission."""
+
+SQL_SUBMISSION_STATUS = """\
+SELECT
+    submission_id,
+    created,
+    status,
+    error,
+    analysis_id,
+    scenario_ids
+FROM submissions
+WHERE submission_id = ?
+"""
+"""SQLite command for fetching the status of a submission."""
+
+SQL_SET_SUBMISSION_STATUS = """\
+UPDATE submissions
+SET
+    status = ?,
+    error = ?
+WHERE submission_id = ?
+"""
+"""SQLite command for updating the status of a submission."""
+
+SQL_COMPLETE_SUBMISSION = """\
+UPDATE submissions
+SET
+    status = 'submitted',
+    upload = NULL,
+    analysis_id = (SELECT analysis_id FROM scenarios WHERE scenario_id = ?),
+    scenario_ids = ?
+WHERE submission_id = ?
+"""
+"""SQLite command for marking a submission as submitted, linking it to its scenarios.  The
+raw upload is dropped, as the files are stored with the scenarios."""
+
+SQL_GET_CACHED_CONFIG = """\
+UPDATE config_cache
+SET last_used = ?
+WHERE file_hash = ?
+RETURNING config
+"""
+"""SQLite command for fetching a cached config and marking it as recently used."""
+
+SQL_CACHE_CONFIG = """\
+INSERT OR REPLACE INTO config_cache(file_hash, config, last_used)
+VALUES(?,?,?)
+"""
+"""SQLite command for adding a config to the config cache."""
+
+SQL_EVICT_CONFIGS = """\
+DELETE FROM config_cache
+WHERE file_hash NOT IN (
+    SELECT file_hash FROM config_cache
+    ORDER BY last_used DESC
+    LIMIT ?
+)
+"""
+"""SQLite command for evicting all but the most recently used configs from the config
+cache."""
 
 SQL_CLEAR = """\
 BEGIN TRANSACTION;
-DELETE FROM analyses;
+DELETE FROM results;
+DELETE FROM analysis_results;
 DELETE FROM scenarios;
+DELETE FROM analyses;
+DELETE FROM files;
+DELETE FROM config_cache;
+DELETE FROM submissions;
 DELETE FROM sqlite_sequence;
 COMMIT;
 """
 """Clear all database tables."""
 
 
+def connect() -> sql.Connection:
+    """Return the database connection for the current thread, opening it if needed.
+
+    Connections are kept open and reused, so that prepared statements are cached across
+    calls.  A new connection is opened if ``DB_PATH`` has changed, or in a forked process
+    (e.g. an RQ work horse), where connections inherited from the parent process are
+    dropped without being closed.  Use the connection as a context manager to commit or
+    roll back a transaction; do not close it, use :py:func:`disconnect` instead.
+    """
+    conn: sql.Connection | None = getattr(_local, 'conn', None)
+    if conn is not None:
+        if _local.db_path == DB_PATH:
+            return conn
+        conn.close()
+    conn = sql.connect(DB_PATH, timeout=DB_BUSY_TIMEOUT, factory=_Connection,
+                       cached_statements=SQL_CACHED_STATEMENTS)
+    conn.executescript(SQL_PRAGMAS)
+    _connections.add(conn)
+    _local.conn = conn
+    _local.db_path = DB_PATH
+    return conn
+
+
+def disconnect() -> None:
+    """Close the database connection for the current thread, if any."""
+    conn: sql.Connection | None = getattr(_local, 'conn', None)
+    if conn is not None:
+        conn.close()
+    _local.conn = None
+
+
+def hash_file(file: bytes) -> str:
+    """Return the SHA-256 hash of an uploaded file, as used to key the ``files`` and
+    ``config_cache`` tables."""
+    return hashlib.sha256(file).hexdigest()
+
+
 def submit_scenario(
     name: str,
     analysis_id: int | None,
@@ -114,7 +491,10 @@ def submit_scenario(
     *,
     cur: sql.Cursor
 ) -> int:
-    """Submit a scenario and return the new scenario ID."""
+    """Submit a scenario and return the new scenario ID.  The file is stored only if no
+    identical file is already stored."""
+    file_hash = hash_file(file)
+    cur.execute(SQL_INSERT_FILE, (file_hash, file))
     cur.execute(
         SQL_INSERT_SCENARIO,
         (
@@ -124,7 +504,7 @@ def submit_scenario(
             datetime.now().timestamp(),
             num_reps,
             file_name,
-            file
+            file_hash
         )
     )
     scenario_id = cur.lastrowid
@@ -140,7 +520,7 @@ def submit_scenarios(
 
     Connected to endpoint `submit/` on the REST server.
     """
-    with sql.connect(DB_PATH) as conn:
+    with connect() as conn:
         cur = conn.cursor()
         scenario_ids: list[int] = []
 
@@ -156,7 +536,7 @@ def submit_scenarios(
                 scenario_id = submit_scenario(
                     config.name,
                     analysis_id=analysis_id,
-                    num_reps=1,
+                    num_reps=max(params.num_reps, 1),
                     file_name=config.file_name,
                     file=config.file,
                     cur=cur
@@ -166,34 +546,189 @@ def submit_scenarios(
             conn.commit()
             return scenario_ids
         except sql.Error as err:
-            if conn.in_transaction():
+            if conn.in_transaction:
                 conn.rollback()
             raise err
 
 
-def update_progress(scenario_id: int):
+def submit_upload(upload: bytes) -> int:
+    """Store a raw upload to be parsed by a worker and return the new submission ID.
+
+    Connected to endpoint `submit/` on the REST server.
+    """
+    try:
+        with connect() as conn:
+            cur = conn.cursor()
+            cur.execute(SQL_INSERT_SUBMISSION, (datetime.now().timestamp(), upload))
+            return cur.lastrowid
+    except sql.Error as err:
+        raise err
+
+
+def get_upload(submission_id: int) -> bytes | None:
+    """Return the raw upload of a submission, or None if not found or already parsed."""
+    try:
+        with connect() as conn:
+            row = conn.execute(SQL_SUBMISSION_UPLOAD, (submission_id, )).fetchone()
+            return None if row is None else row[0]
+    except sql.Error as err:
+        raise err
+
+
+def set_submission_status(submission_id: int, status: str, error: str | None = None) -> None:
+    """Set the status of a submission.  If the status is ``failed``, ``error`` should be a
+    JSON object with the ``type`` and ``msg`` of the error, as returned by the REST server."""
+    assert status in SUBMISSION_STATUSES, f'Invalid submission status: {status}'
+    try:
+        with connect() as conn:
+            conn.execute(SQL_SET_SUBMISSION_STATUS, (status, error, submission_id))
+    except sql.Error as err:
+        raise err
+
+
+def complete_submission(submission_id: int, scenario_ids: list[int]) -> None:
+    """Mark a submission as submitted, linking it to the created scenarios."""
+    try:
+        with connect() as conn:
+            conn.execute(SQL_COMPLETE_SUBMISSION,
+                         (scenario_ids[0], json.dumps(scenario_ids), submission_id))
+    except sql.Error as err:
+        raise err
+
+
+def status_submission(submission_id: int) -> dict[str, Any] | None:
+    """Return the status of a submission as a dict, or None if the submission does not
+    exist."""
+    try:
+        with connect() as conn:
+            cur = conn.cursor()
+            cur.row_factory = sql.Row
+            row = cur.execute(SQL_SUBMISSION_STATUS, (submission_id, )).fetchone()
+    except sql.Error as err:
+        raise err
+    if row is None:
+        return None
+    ret = dict(row)
+    for key in ('error', 'scenario_ids'):
+        if ret[key] is not None:
+            ret[key] = json.loads(ret[key])
+    return ret
+
+
+def update_progress(scenario_id: int, num_done: int = 1):
     """Increment the done_reps counter for the scenario with the given ID."""
     try:
-        with sql.connect(DB_PATH) as conn:
+        with connect() as conn:
             cur = conn.cursor()
-            cur.execute(SQL_UPDATE_PROGRESS, (scenario_id, ))
+            cur.execute(SQL_UPDATE_PROGRESS, (num_done, scenario_id))
     except sql.Error as err:
         raise err
 
 
-def save_result(scenario_id: int, result_json: str):
-    """Save the results JSON to database for the scenario with the given ID."""
+class ProgressWriter:
+    """Batched and throttled writer for the progress of a multi-replication scenario.
+
+    Completed replications are accumulated and written to the database at most once every
+    ``min_interval`` seconds.  A partially aggregated result may be written with each update
+    so that early estimates can be shown before the scenario completes.  Use as a context
+    manager to ensure that the final progress is written.
+
+    Attributes:
+        scenario_id (int): The ID of the scenario to update.
+        min_interval (float): Minimum time between database writes, in seconds.
+        pending (int): Number of completed replications not yet written to the database.
+        on_flush (Callable[[int], None] | None):
+            If set, called with the scenario ID after each database write.
+    """
+
+    def __init__(self, scenario_id: int, min_interval: float = PROGRESS_MIN_INTERVAL,
+                 on_flush: Callable[[int], None] | None = None) -> None:
+        self.scenario_id = scenario_id
+        self.min_interval = min_interval
+        self.on_flush = on_flush
+        self.pending = 0
+        self._last_write = -float('inf')
+
+    def add(self, num_done: int = 1, interim_result: Callable[[], str] | None = None) -> None:
+        """Record ``num_done`` completed replications, writing to the database if at least
+        ``min_interval`` seconds have passed since the last write.
+
+        Args:
+            num_done (int): The number of newly completed replications.
+            interim_result (Callable[[], str] | None):
+                Function returning the interim results JSON.  Only called if a database
+                write takes place.
+        """
+        self.pending += num_done
+        if time.monotonic() - self._last_write >= self.min_interval:
+            self.flush(interim_result)
+
+    def flush(self, interim_result: Callable[[], str] | None = None) -> None:
+        """Write any pending progress, and the interim result if given, to the database."""
+        if self.pending == 0:
+            return
+        try:
+            with connect() as conn:
+                cur = conn.cursor()
+                cur.execute(SQL_UPDATE_PROGRESS, (self.pending, self.scenario_id))
+                if interim_result is not None:
+                    cur.execute(SQL_SAVE_RESULT,
+                                (compress_result(interim_result()), self.scenario_id))
+        except sql.Error as err:
+            raise err
+        self.pending = 0
+        self._last_write = time.monotonic()
+        if self.on_flush is not None:
+            self.on_flush(self.scenario_id)
+
+    def close(self) -> None:
+        """Write any pending progress."""
+        self.flush()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+
+def save_result(scenario_id: int, result_json: str) -> int | None:
+    """Save the results JSON to database for the scenario with the given ID.
+
+    Returns:
+        int | None:
+            The ID of the scenario's multi-scenario analysis if this was the last scenario
+            of the analysis to complete, else None.  As the check is part of the same
+            transaction, exactly one call returns the analysis ID.
+    """
     try:
-        with sql.connect(DB_PATH) as conn:
+        with connect() as conn:
             cur = conn.cursor()
-            cur.execute(
-                SQL_SAVE_RESULT,
-                (
-                    datetime.now().timestamp(),  # SET completed = ?
-                    result_json,  # results = ?
-                    scenario_id   # WHERE scenario_id = ?
-                )
-            )
+            cur.execute(SQL_SAVE_RESULT, (compress_result(result_json), scenario_id))
+            cur.execute(SQL_SET_COMPLETED, (datetime.now().timestamp(), scenario_id))
+            row = cur.execute(SQL_ANALYSIS_COMPLETED, (scenario_id, )).fetchone()
+            return None if row is None else row[0]
+    except sql.Error as err:
+        raise err
+
+
+def fail_scenario(scenario_id: int, error: str) -> None:
+    """Record that the simulation of the scenario with the given ID has failed.  The
+    scenario is not marked as completed, so a multi-scenario analysis containing it is not
+    completed either, but counted in its ``num_failed`` field."""
+    try:
+        with connect() as conn:
+            conn.execute(SQL_SET_SCENARIO_ERROR, (error, scenario_id))
+    except sql.Error as err:
+        raise err
+
+
+def save_analysis_result(analysis_id: int, result_json: str) -> None:
+    """Save the aggregated results JSON to database for the multi-scenario analysis with the
+    given ID."""
+    try:
+        with connect() as conn:
+            conn.execute(SQL_SAVE_ANALYSIS_RESULT, (compress_result(result_json), analysis_id))
     except sql.Error as err:
         raise err
 
@@ -204,39 +739,220 @@ def list_scenarios() -> pd.DataFrame:
     Connected to endpoint `scenarios/` on the REST server.
     """
     try:
-        with sql.connect(DB_PATH) as conn:
+        with connect() as conn:
             df = pd.read_sql(SQL_LIST_SCENARIOS, conn)
             return df
     except sql.Error as err:
         raise err
 
 
-def results_scenario(scenario_id: int) -> pd.DataFrame:
-    """Return the results of a scenario task."""
+def list_analyses() -> list[dict[str, Any]]:
+    """Return the list of multi-scenario analyses and their progress.
+
+    Connected to endpoint `multi/` on the REST server.
+    """
+    try:
+        with connect() as conn:
+            cur = conn.cursor()
+            cur.row_factory = sql.Row
+            return [dict(row) for row in cur.execute(SQL_LIST_ANALYSES)]
+    except sql.Error as err:
+        raise err
+
+
+def status_analysis(analysis_id: int) -> dict[str, Any] | None:
+    """Return the progress of a multi-scenario analysis as a dict, or None if the analysis
+    does not exist.  The ``completed`` field is set once all scenarios are completed."""
+    try:
+        with connect() as conn:
+            cur = conn.cursor()
+            cur.row_factory = sql.Row
+            row = cur.execute(SQL_ANALYSIS_STATUS, (analysis_id, )).fetchone()
+            return None if row is None else dict(row)
+    except sql.Error as err:
+        raise err
+
+
+def results_analysis_scenarios(analysis_id: int) -> dict[int, dict]:
+    """Return the results of all scenarios in a multi-scenario analysis, keyed by scenario
+    ID.  Scenarios without results are omitted."""
     try:
-        with sql.connect(DB_PATH) as conn:
-            df = pd.read_sql(SQL_SCENARIO_RESULTS, conn, params=(scenario_id, ))
+        with connect() as conn:
+            rows = conn.execute(SQL_ANALYSIS_SCENARIO_RESULTS, (analysis_id, )).fetchall()
+    except sql.Error as err:
+        raise err
+    return {scenario_id: json.loads(''.join(iter_result(result)))
+            for scenario_id, result in rows}
+
+
+def report_analysis(analysis_id: int) -> bytes | None:
+    """Return the compressed aggregated results of a multi-scenario analysis, or None if not
+    saved yet."""
+    try:
+        with connect() as conn:
+            row = conn.execute(SQL_ANALYSIS_RESULT, (analysis_id, )).fetchone()
+            return None if row is None else row[0]
+    except sql.Error as err:
+        raise err
+
+
+def progress_scenario(scenario_id: int) -> dict[str, Any] | None:
+    """Return the progress fields of a scenario as a dict, or None if the scenario does not
+    exist."""
+    try:
+        with connect() as conn:
+            cur = conn.cursor()
+            cur.row_factory = sql.Row
+            row = cur.execute(SQL_SCENARIO_PROGRESS, (scenario_id, )).fetchone()
+            return None if row is None else dict(row)
+    except sql.Error as err:
+        raise err
+
+
+def progress_running() -> list[dict[str, Any]]:
+    """Return the progress fields of all scenarios that are neither completed nor failed."""
+    try:
+        with connect() as conn:
+            cur = conn.cursor()
+            cur.row_factory = sql.Row
+            return [dict(row) for row in cur.execute(SQL_RUNNING_PROGRESS)]
+    except sql.Error as err:
+        raise err
+
+
+def status_scenario(scenario_id: int) -> pd.DataFrame:
+    """Return the status of a scenario task, without its results."""
+    try:
+        with connect() as conn:
+            df = pd.read_sql(SQL_SCENARIO_STATUS, conn, params=(scenario_id, ))
             return df
     except sql.Error as err:
         raise err
 
 
+def results_scenario(scenario_id: int) -> dict[str, Any] | None:
+    """Return the status and results of a scenario task as a dict, or None if the scenario
+    does not exist.  The ``results`` field holds the compressed results (see
+    :py:func:`iter_result`), or None if no results have been saved yet."""
+    try:
+        with connect() as conn:
+            cur = conn.cursor()
+            cur.row_factory = sql.Row
+            row = cur.execute(SQL_SCENARIO_RESULTS, (scenario_id, )).fetchone()
+            return None if row is None else dict(row)
+    except sql.Error as err:
+        raise err
+
+
+def report_scenario(scenario_id: int) -> bytes | None:
+    """Return the compressed results of a scenario task, or None if no results have been
+    saved yet."""
+    try:
+        with connect() as conn:
+            row = conn.execute(SQL_SCENARIO_REPORT, (scenario_id, )).fetchone()
+            return None if row is None else row[0]
+    except sql.Error as err:
+        raise err
+
+
+def get_cached_config(file_hash: str) -> str | None:
+    """Return the cached config JSON for the workbook with the given SHA-256 hash, or None
+    if not cached."""
+    try:
+        with connect() as conn:
+            # Fetch all rows, so that the UPDATE completes before the commit
+            rows = conn.execute(SQL_GET_CACHED_CONFIG, (time.time(), file_hash)).fetchall()
+            return rows[0][0] if rows else None
+    except sql.Error as err:
+        raise err
+
+
+def cache_config(file_hash: str, config_json: str, max_size: int = CONFIG_CACHE_SIZE) -> None:
+    """Add the config JSON for the workbook with the given SHA-256 hash to the config cache,
+    evicting the least recently used configs if the cache holds more than ``max_size``
+    configs."""
+    try:
+        with connect() as conn:
+            conn.execute(SQL_CACHE_CONFIG, (file_hash, config_json, time.time()))
+            conn.execute(SQL_EVICT_CONFIGS, (max_size, ))
+    except sql.Error as err:
+        raise err
+
+
+def compress_result(result_json: str) -> bytes:
+    """Compress a results JSON string for storage in the database.  The gzip format is used,
+    so that stored results can be sent as-is to HTTP clients accepting gzip encoding."""
+    return gzip.compress(result_json.encode('utf-8'), RESULTS_COMPRESSLEVEL, mtime=0)
+
+
+def iter_result(result: bytes, chunk_size: int = RESULTS_CHUNK_SIZE) -> Iterator[str]:
+    """Decompress a stored result incrementally, yielding the results JSON in chunks."""
+    decompressor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)  # gzip format
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    for start in range(0, len(result), chunk_size):
+        if text := decoder.decode(decompressor.decompress(result[start:start+chunk_size])):
+            yield text
+    if text := decoder.decode(decompressor.flush(), final=True):
+        yield text
+
+
 def init():
     """Initialise the database, adding the required tables if missing."""
     try:
         os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-        with sql.connect(DB_PATH) as conn:
+        with connect() as conn:
             cur = conn.cursor()
             cur.executescript(SQL_INIT)
             conn.commit()
+            migrate_side_tables(conn)
+            migrate_compress_results(conn)
+            migrate_scenario_errors(conn)
     except sql.Error as err:
         raise err
 
+
+def migrate_side_tables(conn: sql.Connection) -> None:
+    """Move uploaded files and results out of a ``scenarios`` table created by an older
+    version of the app, deduplicating identical files."""
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(scenarios)')}
+    if 'file' not in columns:
+        return
+    cur = conn.cursor()
+    cur.executescript(SQL_MIGRATE_SIDE_TABLES)
+    with conn:
+        for scenario_id, file in conn.execute(
+                'SELECT scenario_id, file FROM scenarios WHERE file IS NOT NULL').fetchall():
+            file_hash = hash_file(file)
+            cur.execute(SQL_INSERT_FILE, (file_hash, file))
+            cur.execute('UPDATE scenarios SET file_hash = ? WHERE scenario_id = ?',
+                        (file_hash, scenario_id))
+    cur.execute('ALTER TABLE scenarios DROP COLUMN file')
+    cur.execute('VACUUM')
+
+
+def migrate_compress_results(conn: sql.Connection) -> None:
+    """Compress any results stored as uncompressed text by an older version of the app."""
+    with conn:
+        cur = conn.cursor()
+        for scenario_id, results in conn.execute(
+                "SELECT scenario_id, results FROM results WHERE typeof(results) = 'text'"
+        ).fetchall():
+            cur.execute(SQL_SAVE_RESULT, (compress_result(results), scenario_id))
+
+
+def migrate_scenario_errors(conn: sql.Connection) -> None:
+    """Add the ``error`` column to a ``scenarios`` table created by an older version of the
+    app."""
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(scenarios)')}
+    if 'error' not in columns:
+        conn.execute('ALTER TABLE scenarios ADD COLUMN error TEXT')
+
+
 def clear():
     """Clear all database tables."""
     try:
         os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-        with sql.connect(DB_PATH) as conn:
+        with connect() as conn:
             cur = conn.cursor()
             cur.executescript(SQL_CLEAR)
             conn.commit()
@@ -2,15 +2,67 @@
 
 This module overrides the :py:class:`~salabim.Constant` and
 :py:class:`~salabim.Triangular` classes in :py:mod:`salabim`
-to provide better string representations, and adds a PERT distribution.
+to provide better string representations, and adds a PERT distribution and a
+lightweight categorical distribution.
+
+The :py:class:`Tri`, :py:class:`PERT` and :py:class:`IntPERT` distributions support a
+block-sampling mode: if constructed with a :py:class:`numpy.random.Generator`, samples
+are drawn in blocks of ``buffer_size`` values and served from a buffer, instead of one
+at a time from the :py:mod:`random` module.
 
 See: https://en.wikipedia.org/wiki/PERT_distribution
 """
 
-from typing import Union
+import bisect
+import random
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+from typing import Generic, TypeVar, Union
 
+import numpy as np
 import salabim as sim
 
+T = TypeVar('T')
+
+DEFAULT_BUFFER_SIZE = 4096
+"""Default number of samples drawn at once in block-sampling mode."""
+
+
+class BufferedSampler(ABC):
+    """Abstract base class for distributions supporting block sampling from a
+    :py:class:`numpy.random.Generator`.  Each distribution should have its own generator
+    (see :py:meth:`hpath_backend.model.Model.spawn_rng`), so that its samples do not
+    depend on the buffer sizes or sampling order of other distributions.
+
+    Attributes:
+        rng (numpy.random.Generator | None):
+            Random number generator for block sampling. If None, block sampling is disabled.
+        buffer_size (int): Number of samples drawn per block.
+    """
+    rng: np.random.Generator | None
+    buffer_size: int
+
+    def init_buffer(self, rng: np.random.Generator | None, buffer_size: int) -> None:
+        """Initialise the sample buffer. Called by the constructor of the distribution."""
+        self.rng = rng
+        self.buffer_size = buffer_size
+        self._buffer: list[float] = []
+        self._pos = 0
+
+    @abstractmethod
+    def draw(self, size: int) -> np.ndarray:
+        """Draw ``size`` samples from ``self.rng``."""
+
+    def next_buffered(self) -> float:
+        """Return the next sample from the buffer, refilling it if exhausted."""
+        if self._pos == len(self._buffer):
+            # tolist() makes element access return Python floats
+            self._buffer = self.draw(self.buffer_size).tolist()
+            self._pos = 0
+        val = self._buffer[self._pos]
+        self._pos += 1
+        return val
+
 
 class Constant(sim.Constant):
     """Constant distribution.
@@ -23,7 +75,7 @@ class Constant(sim.Constant):
         return f'Constant({self._value}, time_unit={self.time_unit})'
 
 
-class Tri(sim.Triangular):
+class Tri(BufferedSampler, sim.Triangular):
     """Triangular distribution.
 
     Attributes
@@ -44,17 +96,34 @@ class Tri(sim.Triangular):
             high: float | None = None,
             time_unit: str | None = None,
             randomstream=None,
-            env: sim.Environment | None = None
+            env: sim.Environment | None = None,
+            rng: np.random.Generator | None = None,
+            buffer_size: int = DEFAULT_BUFFER_SIZE
     ) -> None:
         # Reorder low,high,mode parameters
         super().__init__(low, high, mode, time_unit, randomstream, env)
+        self.init_buffer(rng, buffer_size)
+
+    def draw(self, size: int) -> np.ndarray:
+        """:meta private:"""
+        if self._high == self._low:
+            vals = np.full(size, float(self._low))
+        else:
+            vals = self.rng.triangular(self._low, self._mode, self._high, size)
+        return vals * self.time_unit_factor
+
+    def sample(self) -> float:
+        """:meta private:"""
+        if self.rng is None:
+            return super().sample()
+        return self.next_buffered()
 
     def __repr__(self) -> str:
         return f"Triangular(low={self._low}, mode={self._mode}, high={self._high}, "\
                f"time_unit={self.time_unit})"
 
 
-class PERT(sim.Triangular):
+class PERT(BufferedSampler, sim.Triangular):
     """PERT distribution.
 
     A three-point distribution with more probability mass around the mode than the
@@ -81,8 +150,11 @@ class PERT(sim.Triangular):
         time_unit: str | None = None,
         randomstream=None,
         env: sim.Environment | None = None,
+        rng: np.random.Generator | None = None,
+        buffer_size: int = DEFAULT_BUFFER_SIZE
     ) -> None:
         super().__init__(low, high, mode, time_unit, randomstream, env)
+        self.init_buffer(rng, buffer_size)
         self._shape = 4
 
         self._range = high - low
@@ -109,8 +181,15 @@ class PERT(sim.Triangular):
         result.append("  randomstream=" + hex(id(self.randomstream)))
         return sim.return_or_print(result, as_str, file)
 
+    def draw(self, size: int) -> np.ndarray:
+        """:meta private:"""
+        vals = self._low + self.rng.beta(self._alpha, self._beta, size) * self._range
+        return vals * self.time_unit_factor
+
     def sample(self) -> float:
         """:meta private:"""
+        if self.rng is not None:
+            return self.next_buffered()
         beta = self.randomstream.betavariate
         val = self._low + beta(self._alpha, self._beta) * self._range
         return val * self.time_unit_factor
@@ -124,9 +203,12 @@ Distribution = Union[Constant, Tri, PERT]
 
 
 class IntPERT:
-    """Discretized PERT distribution."""
+    """Discretized PERT distribution.  If ``rng`` is given, the underlying PERT distribution
+    uses block sampling."""
 
-    def __init__(self, low: int, mode: int, high: int, env: sim.Environment):
+    def __init__(self, low: int, mode: int, high: int, env: sim.Environment,
+                 rng: np.random.Generator | None = None,
+                 buffer_size: int = DEFAULT_BUFFER_SIZE):
         self.low = low
         """Minimum of the distribution."""
 
@@ -136,7 +218,8 @@ class IntPERT:
         self.high = high
         """Maximum of the distribution."""
 
-        self.pert = PERT(low-mode-0.5, 0, high-mode+0.5, env=env)
+        self.pert = PERT(low-mode-0.5, 0, high-mode+0.5, env=env,
+                         rng=rng, buffer_size=buffer_size)
         """Underlying continuous PERT distribution, i.e.
         ``PERT(low-mode-0.5, 0, high-mode+0.5)``."""
 
@@ -150,3 +233,46 @@ class IntPERT:
 
     def __repr__(self) -> str:
         return f'IntPERT({self.low}, {self.mode}, {self.high})'
+
+
+class Categorical(Generic[T]):
+    """Categorical distribution over a fixed sequence of values.
+
+    Equivalent to :py:class:`salabim.CumPdf` with non-distribution values, but sampling
+    takes a single uniform draw and a binary search of a precomputed cumulative
+    probability table, without per-sample validation.  Instances are meant to be
+    constructed once per model and reused.
+    """
+
+    def __init__(
+        self,
+        values: Sequence[T],
+        cumprobabilities: Sequence[float],
+        randomstream: random.Random | None = None
+    ) -> None:
+        if len(values) != len(cumprobabilities):
+            raise ValueError('Length of values does not match length of cumulative probabilities.')
+        if any(p2 < p1 for p1, p2 in zip(cumprobabilities, cumprobabilities[1:])):
+            raise ValueError('Non-increasing cumulative probabilities.')
+        if cumprobabilities[-1] <= 0:
+            raise ValueError('Last cumulative probability should be >0.')
+
+        self.values = tuple(values)
+        """Values of the distribution."""
+
+        self.cum = tuple(p / cumprobabilities[-1] for p in cumprobabilities)
+        """Normalised cumulative probabilities of the values."""
+
+        self.randomstream = random if randomstream is None else randomstream
+        """Source of uniform random numbers (default: the :py:mod:`random` module)."""
+
+    def sample(self) -> T:
+        """Sample the distribution."""
+        return self()
+
+    def __call__(self) -> T:
+        # First value with cumulative probability >= r, as in salabim.CumPdf
+        return self.values[bisect.bisect_left(self.cum, self.randomstream.random())]
+
+    def __repr__(self) -> str:
+        return f'Categorical({self.values}, cum={self.cum})'
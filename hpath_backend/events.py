@@ -0,0 +1,134 @@
+"""Progress events for scenarios and multi-scenario analyses, via Redis pub/sub.
+
+Simulation workers publish an event to :py:data:`EVENTS_CHANNEL` whenever the progress of
+a scenario is written to the database, and when a multi-scenario analysis completes.  The
+REST server relays these events to clients as server-sent events (SSE), so that dashboards
+do not need to poll the database for progress.
+
+Each event has a type and a JSON object as data:
+
+- ``snapshot``: a list of the progress of all running scenarios, sent once at the start
+  of each stream, with the same fields as ``scenario`` events.
+- ``scenario``: the ``scenario_id``, ``analysis_id``, ``num_reps``, ``done_reps``,
+  ``completed``, and ``error`` fields of a scenario, as in ``/scenarios/``.
+- ``analysis``: the ``analysis_id`` of a completed multi-scenario analysis, whose
+  aggregated results are available.
+"""
+import json
+import logging
+import threading
+import time
+from collections.abc import Iterator
+from typing import Any
+
+import redis
+
+from conf import REDIS_HOST, REDIS_PORT, SSE_MAX_DURATION, SSE_MAX_STREAMS
+from . import db
+
+EVENTS_CHANNEL = 'hpath:events'
+"""Redis pub/sub channel for progress events."""
+
+SSE_KEEPALIVE = 15.0
+"""Interval in seconds between keep-alive comments sent on idle event streams."""
+
+SSE_RETRY_MS = 5000
+"""Time in milliseconds for clients to wait before reconnecting to a closed event stream."""
+
+REDIS_CONN = redis.Redis(host=REDIS_HOST, port=REDIS_PORT)
+"""Connection to the redis server for publishing and subscribing to events."""
+
+_STREAM_SLOTS = threading.BoundedSemaphore(SSE_MAX_STREAMS)
+
+logger = logging.getLogger(__name__)
+
+
+def publish(event: str, data: dict[str, Any]) -> None:
+    """Publish an event.  Redis errors are logged, but not raised, so that a Redis outage
+    does not fail a simulation."""
+    try:
+        REDIS_CONN.publish(EVENTS_CHANNEL, json.dumps({'event': event, 'data': data}))
+    except redis.RedisError as err:
+        logger.warning('Failed to publish %s event: %s', event, err)
+
+
+def publish_scenario(scenario_id: int) -> None:
+    """Publish the progress of a scenario, as stored in the database."""
+    progress = db.progress_scenario(scenario_id)
+    if progress is not None:
+        publish('scenario', progress)
+
+
+def publish_analysis(analysis_id: int) -> None:
+    """Publish the completion of a multi-scenario analysis."""
+    publish('analysis', {'analysis_id': analysis_id})
+
+
+class StreamLimitError(Exception):
+    """Raised if the maximum number of concurrent event streams is reached."""
+
+
+class EventStream:
+    """Server-sent event stream of progress events, to be returned as the body of a
+    ``text/event-stream`` response.
+
+    On creation, a stream slot is taken and the Redis channel is subscribed to, so that
+    errors are raised before the response starts.  The stream starts with a ``snapshot``
+    event listing the progress of all running scenarios, then relays events as they are
+    published, with keep-alive comments while idle.  Each open stream holds a request
+    thread, so at most :py:data:`~conf.SSE_MAX_STREAMS` streams may be open at a time per
+    process, and each stream ends after :py:data:`~conf.SSE_MAX_DURATION` seconds; clients
+    then reconnect after ``SSE_RETRY_MS`` milliseconds.
+
+    The stream slot and subscription are released by :py:meth:`close`, which the WSGI
+    server calls when the response ends or the client disconnects.
+
+    Raises:
+        StreamLimitError: If the maximum number of streams is open.
+        redis.RedisError: If the Redis channel cannot be subscribed to.
+    """
+
+    def __init__(self) -> None:
+        if not _STREAM_SLOTS.acquire(blocking=False):
+            raise StreamLimitError(f'Too many open event streams (max. {SSE_MAX_STREAMS}).')
+        self._closed = False
+        self._pubsub = None
+        try:
+            self._pubsub = REDIS_CONN.pubsub(ignore_subscribe_messages=True)
+            self._pubsub.subscribe(EVENTS_CHANNEL)
+            # Subscribed first, so that no progress is missed between snapshot and events
+            self._snapshot = db.progress_running()
+        except BaseException:
+            self.close()
+            raise
+
+    def __iter__(self) -> Iterator[str]:
+        yield f'retry: {SSE_RETRY_MS}\n\n'
+        yield f'event: snapshot\ndata: {json.dumps(self._snapshot)}\n\n'
+        end = time.monotonic() + SSE_MAX_DURATION
+        last_sent = time.monotonic()
+        try:
+            while (now := time.monotonic()) < end:
+                # get_message() may also return None early, e.g. for ignored subscribe
+                # messages, so keep-alives are timed from the last message sent
+                timeout = min(last_sent + SSE_KEEPALIVE, end) - now
+                message = self._pubsub.get_message(timeout=max(timeout, 0))
+                if message is not None:
+                    event = json.loads(message['data'])
+                    yield f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+                    last_sent = time.monotonic()
+                elif time.monotonic() - last_sent >= SSE_KEEPALIVE:
+                    yield ': keep-alive\n\n'
+                    last_sent = time.monotonic()
+        except redis.RedisError as err:
+            # End the stream; the client reconnects once Redis is available
+            logger.warning('Event stream interrupted: %s', err)
+
+    def close(self) -> None:
+        """Unsubscribe and release the stream slot.  Safe to call more than once."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._pubsub is not None:
+            self._pubsub.close()
+        _STREAM_SLOTS.release()
@@ -1,22 +1,118 @@
-"""Functions for reading Excel data."""
+"""Functions for reading Excel data.
 
+The functions accept either an openpyxl workbook, or a :py:class:`WorkbookReader`, which
+reads a workbook in read-only mode and caches all of its defined names and tables.
+"""
+
+import os
 from datetime import datetime
-from typing import Union
+from typing import IO, Union
 
 import numpy as np
 import openpyxl as xl
 import pandas as pd
 from openpyxl.cell.cell import Cell
+from openpyxl.packaging.relationship import get_dependents, get_rels_path
+from openpyxl.reader.excel import ExcelReader
+from openpyxl.utils.cell import range_boundaries
+from openpyxl.worksheet.table import Table
+from openpyxl.xml.functions import fromstring
 
 CellType = Union[int, float, str, datetime]
 
 
-def get_name(wbook: xl.Workbook, name: str) -> CellType | np.ndarray:
+class WorkbookReader:
+    """Read-only Excel workbook with cached defined names and tables.
+
+    The workbook is loaded in openpyxl's read-only mode, with formulas replaced by their
+    computed values.  Each worksheet referenced by a defined name or table is read in a
+    single pass, and the values of all defined names and tables are stored in NumPy arrays
+    and pandas DataFrames respectively.  The workbook is closed once loaded.
+
+    Attributes:
+        names (dict[str, CellType | numpy.ndarray]):
+            Values of the defined names, as single values for single cells and as 2D arrays
+            otherwise.  Names not referring to a cell range are omitted.
+        tables (dict[tuple[str, str], pandas.DataFrame]):
+            Values of the tables, keyed by worksheet name and table name.
+    """
+
+    def __init__(self, file: str | os.PathLike | IO[bytes]) -> None:
+        reader = ExcelReader(file, read_only=True, data_only=True)
+        reader.read()
+        wbook = reader.wb
+        try:
+            # Tables are not loaded in read-only mode, so read them from the archive
+            table_refs: dict[tuple[str, str], str] = {}
+            for sheet, rel in reader.parser.find_sheets():
+                rels_path = get_rels_path(rel.target)
+                if rels_path not in reader.valid_files:
+                    continue
+                for table_rel in get_dependents(reader.archive, rels_path).find(Table._rel_type):
+                    table = Table.from_tree(fromstring(reader.archive.read(table_rel.target)))
+                    table_refs[sheet.name, table.name] = table.ref
+
+            name_refs: dict[str, tuple[str, str]] = {}
+            for name, defined_name in wbook.defined_names.items():
+                destinations = list(defined_name.destinations)
+                if destinations:
+                    worksheet, cell_range = destinations[0]
+                    name_refs[name] = worksheet, cell_range.replace('$', '')
+
+            sheet_names = {sheet for sheet, _ in [*name_refs.values(), *table_refs]}
+            sheets = {sheet: _read_sheet(wbook[sheet])
+                      for sheet in sheet_names if sheet in wbook.sheetnames}
+        finally:
+            wbook.close()
+
+        self.names: dict[str, CellType | np.ndarray] = {}
+        for name, (sheet, cell_range) in name_refs.items():
+            if sheet not in sheets:
+                continue
+            values = _slice(sheets[sheet], cell_range)
+            # Match openpyxl, which returns a single cell for single-cell references
+            self.names[name] = values[0][0] if ':' not in cell_range else np.array(values)
+
+        self.tables: dict[tuple[str, str], pd.DataFrame] = {}
+        for (sheet, name), cell_range in table_refs.items():
+            values = _slice(sheets[sheet], cell_range)
+            self.tables[sheet, name] = pd.DataFrame(values[1:], columns=values[0])
+
+    def get_name(self, name: str) -> CellType | list:
+        """Read an Excel named range.  See :py:func:`get_name`."""
+        value = self.names[name]
+        if isinstance(value, np.ndarray):
+            return value.squeeze().tolist()
+        return value
+
+    def get_table(self, sheet_name: str, name: str) -> pd.DataFrame:
+        """Get a named table as a pandas DataFrame.  See :py:func:`get_table`."""
+        return self.tables[sheet_name, name].copy()
+
+
+def _read_sheet(worksheet) -> list[list[CellType | None]]:
+    """Read the values of a read-only worksheet in a single pass."""
+    return [list(row) for row in worksheet.iter_rows(values_only=True)]
+
+
+def _slice(sheet: list[list[CellType | None]], cell_range: str) -> list[list[CellType | None]]:
+    """Return the values in a cell range of a worksheet read by :py:func:`_read_sheet`.
+    Cells outside the worksheet's data are empty."""
+    min_col, min_row, max_col, max_row = range_boundaries(cell_range)
+    ret = []
+    for row_idx in range(min_row - 1, max_row):
+        row = sheet[row_idx] if row_idx < len(sheet) else []
+        ret.append([row[col_idx] if col_idx < len(row) else None
+                    for col_idx in range(min_col - 1, max_col)])
+    return ret
+
+
+def get_name(wbook: xl.Workbook | WorkbookReader, name: str) -> CellType | np.ndarray:
     """Read an Excel named range as a single value or NumPy array.
     Arrays are flattened to one dimension if possible.
 
     Args:
-        wbook (openpyxl.workbook.workbook.Workbook):
+        wbook (openpyxl.workbook.workbook.Workbook | WorkbookReader):
             The workbook object.
         name (str): Name of the Excel range to read.
 
@@ -24,6 +120,8 @@ def get_name(wbook: xl.Workbook, name: str) -> CellType | np.ndarray:
         int | float | str | datetime.datetime | numpy.ndarray:
             A single value, or a NumPy array containing the named range's values.
     """
+    if isinstance(wbook, WorkbookReader):
+        return wbook.get_name(name)
     worksheet, cell_range = list(wbook.defined_names[name].destinations)[0]
     cell_range = str.replace(cell_range, "$", "")
     cells = wbook[worksheet][cell_range]
@@ -35,7 +133,7 @@ def get_name(wbook: xl.Workbook, name: str) -> CellType | np.ndarray:
     return value
 
 
-def get_named_matrix(wbook: xl.Workbook, index_name: str, data_name: str
+def get_named_matrix(wbook: xl.Workbook | WorkbookReader, index_name: str, data_name: str
                      ) -> dict[str, dict[str, float]]:
     """Read a matrix with named rows/columns and convert
     to a dict of dicts.
@@ -44,7 +142,7 @@ def get_named_matrix(wbook: xl.Workbook, index_name: str, data_name: str
     runner times between pairs of locations.
 
     Args:
-        wbook (openpyxl.workbook.workbook.Workbook): The workbook object.
+        wbook (openpyxl.workbook.workbook.Workbook | WorkbookReader): The workbook object.
         index_name (str):
             Name of the Excel named range containing the row/column names of the matrix.
         data_name (str): Name of the Excel named range containing the matrix data.
@@ -65,17 +163,20 @@ def get_named_matrix(wbook: xl.Workbook, index_name: str, data_name: str
     return ret
 
 
-def get_table(workbook: xl.Workbook, sheet_name: str, name: str) -> pd.DataFrame:
+def get_table(workbook: xl.Workbook | WorkbookReader, sheet_name: str, name: str
+              ) -> pd.DataFrame:
     """Gets a named table from an Excel workbook as a pandas array
 
     Args:
-        workbook (openpyxl.workbook.workbook.Workbook): The workbook object.
+        workbook (openpyxl.workbook.workbook.Workbook | WorkbookReader): The workbook object.
         sheet (str): Name of the worksheet containing the table.
         name (str): Name of the table to read.
 
     Returns:
         pandas.DataFrame: A pandas dataframe containing the named table's values.
     """
+    if isinstance(workbook, WorkbookReader):
+        return workbook.get_table(sheet_name, name)
     # Named Tables in openpyxl belong to the worksheet
     sheet = workbook[sheet_name]
     cell_range = sheet[sheet.tables[name].ref]
@@ -1,5 +1,7 @@
 """Compute KPIs for a model from simulation results."""
-from typing import TYPE_CHECKING, Iterable
+import weakref
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Iterable
 from typing_extensions import TypedDict
 
 import numpy as np
@@ -9,6 +11,8 @@ import salabim as sim
 
 from . import util
 from .chart_datatypes import ChartData, MultiChartData
+from .profiling import Profile
+from .specimen_data import CATEGORIES, STAGES
 
 if TYPE_CHECKING:
     from .model import Model
@@ -16,28 +20,57 @@ if TYPE_CHECKING:
 # TODO: create confidence-interval versions of the below KPI functions
 
 
+def _hourly_mean(t: np.ndarray, x: np.ndarray, hours: np.ndarray) -> np.ndarray:
+    """Time-weighted mean of a step function over each hour interval ``[h, h+1)`` for ``h``
+    in ``hours``.  The step function takes value ``x[i]`` on ``[t[i], t[i+1])`` and is only
+    defined on ``[t[0], t[-1]]``, so intervals are clipped to this range.  Zero-length
+    intervals take the step function value at the interval start.  Intervals outside the
+    range are NaN."""
+    # Area under the step function up to each change point
+    area = np.concatenate(([0.0], np.cumsum(x[:-1] * np.diff(t))))
+
+    def integral(pts: np.ndarray) -> np.ndarray:
+        idx = np.maximum(np.searchsorted(t, pts, side='right') - 1, 0)
+        return area[idx] + x[idx] * (pts - t[idx])
+
+    lo = np.maximum(hours, t[0])
+    hi = np.minimum(hours + 1, t[-1])
+    width = hi - lo
+
+    ret = np.full(hours.shape, np.nan)
+    pos = width > 0
+    ret[pos] = (integral(hi[pos]) - integral(lo[pos])) / width[pos]
+    zero = width == 0
+    ret[zero] = x[np.searchsorted(t, lo[zero], side='right') - 1]
+    return ret
+
+
+def hourly_means(monitors: dict[str, sim.Monitor]) -> pd.DataFrame:
+    """Return a dataframe showing the hourly time-weighted mean of each level monitor in
+    ``monitors``, with the dict keys as column names.  All monitors share the same hourly
+    index, from the earliest to the latest monitor timestamp."""
+    txs = {key: tuple(np.asarray(arr, dtype=float) for arr in mon.tx())
+           for key, mon in monitors.items()}
+    t_min = min(t[0] for t, _ in txs.values())
+    t_max = max(t[-1] for t, _ in txs.values())
+    hours = np.arange(np.floor(t_min), np.floor(t_max) + 1)
+
+    df = pd.DataFrame({key: _hourly_mean(t, x, hours) for key, (t, x) in txs.items()},
+                      index=hours)
+    df.index.name = 't'
+    return df
+
+
 def wip_hourly(wip: sim.Monitor) -> pd.DataFrame:
     """Return a dataframe showing the hourly mean WIP
     of a histopath stage."""
-    df = pd.DataFrame(wip.tx())\
-        .T\
-        .rename(columns={0: 't', 1: wip.name()})\
-        .set_index('t')
-    df.index = pd.to_timedelta(df.index, 'h')
-
-    df1 = df.resample('h').mean()
-    df1.index /= pd.Timedelta(1, unit='h')
-
-    # handle hour intervals with no WIP changes
-    df2 = df.resample('h').ffill()
-    df2.index /= pd.Timedelta(1, unit='h')
-    return df1.fillna(df2)
+    return hourly_means({wip.name(): wip})
 
 
 def wip_hourlies(mdl: 'Model') -> pd.DataFrame:
     """Return a dataframe showing the hourly mean WIP
     for each stage in the histopathology process."""
-    return pd.concat([wip_hourly(wip) for wip in util.dc_values(mdl.wips)], axis='columns')
+    return hourly_means({wip.name(): wip for wip in util.dc_values(mdl.wips)})
 
 
 def wip_summary(mdl: 'Model') -> pd.DataFrame:
@@ -48,48 +81,89 @@ def wip_summary(mdl: 'Model') -> pd.DataFrame:
     return df.T
 
 
-def _timestamp_helper(mdl: 'Model') -> pd.DataFrame:
-    # Actually contains more data than just timestamps but we will ignore those columns
-    timestamps = pd.DataFrame.from_dict(
-        {
-            # Only keep non-bootstrap specimens that have completed service
-            k: v for k, v in mdl.specimen_data.items() if 'init' not in k and 'report_end' in v
-        },
-        orient='index'
-    )
+@dataclass(kw_only=True, eq=False)
+class Timestamps:
+    """Columnar table of the stage timestamps of all non-bootstrap specimens that have
+    completed service.  Row ``i`` of each column refers to the same specimen.
+
+    Attributes:
+        specimen_id (numpy.ndarray):
+            Integer specimen IDs, e.g. 123 for ``specimen.123``.
+        priority (pandas.Categorical): Specimen priorities, by name.
+        cancer (numpy.ndarray): Boolean array, true for cancer-pathway specimens.
+        start (dict[str, numpy.ndarray]): Float64 start timestamps for each stage in STAGES.
+        end (dict[str, numpy.ndarray]): Float64 end timestamps for each stage in STAGES.
+    """
+    specimen_id: np.ndarray
+    priority: pd.Categorical
+    cancer: np.ndarray
+    start: dict[str, np.ndarray]
+    end: dict[str, np.ndarray]
+
+    @staticmethod
+    def from_model(mdl: 'Model') -> 'Timestamps':
+        """Build the timestamp table from the specimen data of a model."""
+        store = mdl.specimen_data
+        if not store.keep_times:
+            raise ValueError('Specimen timestamps were only written to the trace file '
+                             '(trace_only=True), so KPIs cannot be computed from the model.')
+        report_end = store.column('report_end')
 
-    # specimen.123 -> 123
-    timestamps.index = [int(idx.rsplit('.', 1)[1]) for idx in timestamps.index]
-    return timestamps
+        # Only keep non-bootstrap specimens that have completed service
+        mask = ~store.mock[:store.num_rows] & ~np.isnan(report_end)
 
+        def column(key: str) -> np.ndarray:
+            return store.column(key)[mask]
 
-def overall_tat(mdl: 'Model') -> pd.DataFrame:
+        return __class__(
+            specimen_id=store.specimen_id[:store.num_rows][mask],
+            priority=pd.Categorical.from_codes(column('priority'),
+                                               categories=CATEGORIES['priority']),
+            cancer=column('cancer') == 1,
+            start={stage: column(f'{stage}_start') for stage in STAGES},
+            end={stage: column(f'{stage}_end') for stage in STAGES}
+        )
+
+    def tat(self) -> np.ndarray:
+        """Overall turnaround time of each specimen."""
+        return self.end['report'] - self.start['reception']
+
+    def lab_tat(self) -> np.ndarray:
+        """Lab turnaround time of each specimen, i.e. up to the end of QC."""
+        return self.end['qc'] - self.start['reception']
+
+
+_TIMESTAMPS_CACHE: 'weakref.WeakKeyDictionary[Model, tuple[float, Timestamps]]' =\
+    weakref.WeakKeyDictionary()
+
+
+def timestamps(mdl: 'Model') -> Timestamps:
+    """Return the timestamp table of a model.  The table is built once and cached until the
+    simulation clock of the model advances."""
+    cached = _TIMESTAMPS_CACHE.get(mdl)
+    if cached is None or cached[0] != mdl.now():
+        cached = (mdl.now(), Timestamps.from_model(mdl))
+        _TIMESTAMPS_CACHE[mdl] = cached
+    return cached[1]
+
+
+def overall_tat(mdl: 'Model') -> float:
     """Overall mean turnaround time."""
-    timestamps = _timestamp_helper(mdl)
-    # Extract TAT from data columns
-    tat_total = timestamps['report_end'] - timestamps['reception_start']
-    return tat_total.mean()
+    return np.mean(timestamps(mdl).tat())
 
 
-def overall_lab_tat(mdl: 'Model') -> pd.DataFrame:
+def overall_lab_tat(mdl: 'Model') -> float:
     """Overall mean turnaround time."""
-    timestamps = _timestamp_helper(mdl)
-    # Extract TAT from data columns
-    tat_lab = timestamps['qc_end'] - timestamps['reception_start']
-    return tat_lab.mean()
+    return np.mean(timestamps(mdl).lab_tat())
 
 
 def tat_by_stage(mdl: 'Model') -> pd.DataFrame:
     """Return a dataframe with the histopath stages as rows, and
     the mean turnaround time of each stage as its "mean (hours)" column."""
-    timestamps = _timestamp_helper(mdl)
-
-    stages = [x.rsplit('_end', 1)[0] for x in timestamps.columns if x.endswith('_end')]
-    df = pd.concat([timestamps[f'{x}_end'] - timestamps[f'{x}_start']
-                    for x in stages], axis='columns')
-    df.columns = stages
-
-    ret = pd.DataFrame({'mean (hours)': df.mean()})
+    table = timestamps(mdl)
+    ret = pd.DataFrame({'mean (hours)': [
+        np.nanmean(table.end[stage] - table.start[stage]) for stage in STAGES
+    ]})
     ret.index = [wip.name() for wip in
                  util.dc_values(mdl.wips)][1:]  # Remove 'Total' to match ret data
     return ret
@@ -99,13 +173,9 @@ def tat_dist(mdl: 'Model', day_list: Iterable[int]) -> pd.DataFrame:
     """Return a dataframe showing the proportion of specimens
     completed within ``n`` days, for ``n`` in ``day_list``. Both
     overall and lab turnaround time are shown."""
-
-    # Actually contains more data than just timestamps but we will ignore those columns
-    timestamps = _timestamp_helper(mdl)
-
-    # Extract TAT from data columns
-    tat_total = timestamps['report_end'] - timestamps['reception_start']
-    tat_lab = timestamps['qc_end'] - timestamps['reception_start']
+    table = timestamps(mdl)
+    tat_total = table.tat()
+    tat_lab = table.lab_tat()
 
     return pd.DataFrame([{
         'days': days,
@@ -141,52 +211,26 @@ def allocation_timeseries(res: sim.Resource) -> pd.DataFrame:
 
 def utilisation_hourly(res: sim.Resource) -> pd.DataFrame:
     """Return a dataframe showing the hourly mean utilisation of a resource."""
-    df = pd.DataFrame(res.claimed_quantity.tx())\
-        .T\
-        .rename(columns={0: 't', 1: res.name()})\
-        .set_index('t')
-    df.index = pd.to_timedelta(df.index, unit='h')
-    df1 = df.resample('h').mean()
-    df1.index /= pd.Timedelta(1, unit='h')
-
-    # handle hour intervals with no utilisation changes
-    df2 = df.resample('h').ffill()
-    df2.index /= pd.Timedelta(1, unit='h')
-    return df1.fillna(df2)
+    return hourly_means({res.name(): res.claimed_quantity})
 
 
 def utilisation_hourlies(mdl: 'Model') -> pd.DataFrame:
     """Return a dataframe showing the hourly mean utilisation of each resource."""
-    return pd.concat(
-        [utilisation_hourly(res) for res in util.dc_values(mdl.resources)],
-        axis='columns'
-    )
+    return hourly_means({res.name(): res.claimed_quantity
+                         for res in util.dc_values(mdl.resources)})
 
 
 def q_length_hourly(res: sim.Resource) -> pd.DataFrame:
     """Return a dataframe showing the hourly mean queue length for a resource.
     Queue members can be specimen, block, slide, or batch tasks including delivery."""
-    df = pd.DataFrame(res.requesters().length.tx())\
-        .T\
-        .rename(columns={0: 't', 1: res.name()})\
-        .set_index('t')
-    df.index = pd.to_timedelta(df.index, unit='h')
-    df1 = df.resample('h').mean()
-    df1.index /= pd.Timedelta(1, unit='h')
-
-    # handle hour intervals with no queue changes
-    df2 = df.resample('h').ffill()
-    df2.index /= pd.Timedelta(1, unit='h')
-    return df1.fillna(df2)
+    return hourly_means({res.name(): res.requesters().length})
 
 
 def q_length_hourlies(mdl: 'Model') -> pd.DataFrame:
     """Return a dataframe showing the hourly mean queue length of each resource.
     Queue members can be specimen, block, slide, or batch tasks including delivery."""
-    return pd.concat(
-        [utilisation_hourly(res) for res in util.dc_values(mdl.resources)],
-        axis='columns'
-    )
+    return hourly_means({res.name(): res.requesters().length
+                         for res in util.dc_values(mdl.resources)})
 
 
 Progress = TypedDict('Progress', {
@@ -226,6 +270,9 @@ class Report(pyd.BaseModel):
     lab_progress_min: LabProgress | None = pyd.Field(default=None)
     lab_progress_max: LabProgress | None = pyd.Field(default=None)
 
+    profile: Profile | None = pyd.Field(default=None)
+    """Profiling counters, if the model was run with profiling enabled."""
+
     @staticmethod
     def from_model(mdl: 'Model') -> 'Report':
         """Produce a single dataclass for passing simulation results to a frontend server."""
@@ -246,10 +293,89 @@ class Report(pyd.BaseModel):
             utilization_by_resource=ChartData.from_pandas(utilisation_means(mdl)),
             q_length_by_resource=ChartData.from_pandas(q_length_means(mdl)),
             hourly_utilization_by_resource=MultiChartData.from_pandas(
-                utilisation_hourlies(mdl))
+                utilisation_hourlies(mdl)),
+            profile=mdl.profiler.profile() if mdl.profiler is not None else None
+        )
+
+    @staticmethod
+    def from_reports(reports: list['Report']) -> 'Report':
+        """Combine the reports of multiple simulation replications into a single report.
+
+        Each KPI is averaged over the replications.  The minimum and maximum over the
+        replications are stored in the ``*_min`` and ``*_max`` fields, or in the ``ymin`` and
+        ``ymax`` fields of the chart data.  Resource allocations are identical in each
+        replication, so these are taken from the first report.  Profiling counters, if
+        present in all reports, are summed.
+        """
+        tats = _rep_stats([rep.overall_tat for rep in reports])
+        lab_tats = _rep_stats([rep.lab_tat for rep in reports])
+        progress = _rep_dict_stats([rep.progress for rep in reports])
+        lab_progress = _rep_dict_stats([rep.lab_progress for rep in reports])
+
+        return __class__(
+            overall_tat=tats[0],
+            lab_tat=lab_tats[0],
+            progress=progress[0],
+            lab_progress=lab_progress[0],
+            tat_by_stage=_rep_chart_stats([rep.tat_by_stage for rep in reports]),
+            resource_allocation=reports[0].resource_allocation,
+            wip_by_stage=_rep_multichart_stats([rep.wip_by_stage for rep in reports]),
+            utilization_by_resource=_rep_chart_stats(
+                [rep.utilization_by_resource for rep in reports]),
+            q_length_by_resource=_rep_chart_stats([rep.q_length_by_resource for rep in reports]),
+            hourly_utilization_by_resource=_rep_multichart_stats(
+                [rep.hourly_utilization_by_resource for rep in reports]),
+            overall_tat_min=tats[1],
+            overall_tat_max=tats[2],
+            lab_tat_min=lab_tats[1],
+            lab_tat_max=lab_tats[2],
+            progress_min=progress[1],
+            progress_max=progress[2],
+            lab_progress_min=lab_progress[1],
+            lab_progress_max=lab_progress[2],
+            profile=(Profile.from_profiles([rep.profile for rep in reports])
+                     if all(rep.profile is not None for rep in reports) else None)
         )
 
 
+def _rep_stats(values: list[float]) -> tuple[float, float, float]:
+    """Mean, minimum, and maximum of a KPI over simulation replications."""
+    arr = np.array(values, dtype=float)
+    return arr.mean(), arr.min(), arr.max()
+
+
+def _rep_dict_stats(dicts: list[dict[str, float]]) -> tuple[dict, dict, dict]:
+    """Key-wise mean, minimum, and maximum of a dict-valued KPI over simulation replications."""
+    keys = list(dicts[0].keys())
+    arr = np.array([[dct[key] for key in keys] for dct in dicts], dtype=float)
+    return tuple(dict(zip(keys, vals.tolist())) for vals in (arr.mean(0), arr.min(0), arr.max(0)))
+
+
+def _rep_chart_stats(charts: list[ChartData]) -> ChartData:
+    """Point-wise mean, minimum, and maximum of chart data over simulation replications."""
+    arr = np.array([chart.y for chart in charts], dtype=float)
+    return ChartData(
+        x=charts[0].x,
+        y=arr.mean(0).tolist(),
+        ymin=arr.min(0).tolist(),
+        ymax=arr.max(0).tolist()
+    )
+
+
+def _rep_multichart_stats(charts: list[MultiChartData]) -> MultiChartData:
+    """Point-wise mean, minimum, and maximum of multi-series chart data over simulation
+    replications.  Series are truncated to the shortest x-axis over all replications."""
+    length = min(len(chart.x) for chart in charts)
+    arr = np.array([[series[:length] for series in chart.y] for chart in charts], dtype=float)
+    return MultiChartData(
+        x=charts[0].x[:length],
+        y=arr.mean(0).tolist(),
+        labels=charts[0].labels,
+        ymin=arr.min(0).tolist(),
+        ymax=arr.max(0).tolist()
+    )
+
+
 def multi_mean_tats(all_results: dict[int, dict]) -> ChartData:
     """Chart data for bar chart of overall mean TATs by scenario.
 
@@ -304,3 +430,14 @@ def multi_util_hourlies(all_results: dict[int, dict]) -> dict[str, MultiChartDat
         chart_data['y'] = [result[kpi]['y'][idx] for result in all_results.values()]
         ret[resource] = chart_data
     return ret
+
+
+def multi_report(all_results: dict[int, dict]) -> dict[str, Any]:
+    """Aggregate the results of the scenarios in a multi-scenario analysis into the chart
+    data for the analysis, keyed by KPI."""
+    return {
+        'scenario_ids': list(all_results.keys()),
+        'overall_tat': multi_mean_tats(all_results),
+        'utilization_by_resource': multi_mean_util(all_results),
+        'hourly_utilization_by_resource': multi_util_hourlies(all_results)
+    }
@@ -33,13 +33,13 @@ class InitSpecimen(Specimen):
             elapsed_time += env.task_durations.pre_booking_in_investigation()
 
         # Booking-in
-        if env.specimen_data[self.name()]['source'] == 'Internal':
+        if self.data['source'] == 'Internal':
             elapsed_time += env.task_durations.booking_in_internal()
         else:
             elapsed_time += env.task_durations.booking_in_external()
 
         # Additional investigation
-        if env.specimen_data[self.name()]['source'] == 'Internal':
+        if self.data['source'] == 'Internal':
             r = env.u01()
             if r < env.globals.prob_invest_easy:
                 elapsed_time += env.task_durations.booking_in_investigation_internal_easy()
@@ -49,8 +49,8 @@ class InitSpecimen(Specimen):
             elapsed_time += env.task_durations.booking_in_investigation_external()
 
         # End of stage
-        env.specimen_data[self.name()]['bootstrap']['reception'] = elapsed_time
-        env.specimen_data[self.name()]['bootstrap']['reception_to_cutup']\
+        self.data['bootstrap']['reception'] = elapsed_time
+        self.data['bootstrap']['reception_to_cutup']\
             = env.processes['reception_to_cutup'].out_duration
 
     def init_cut_up(self) -> None:
@@ -61,10 +61,10 @@ class InitSpecimen(Specimen):
         r = env.u01()
         suffix = '_urgent' if self.prio == Priority.URGENT else ''
         if r < getattr(env.globals, 'prob_bms_cutup'+suffix):
-            env.specimen_data[self.name()]["cutup_type"] = 'BMS'
+            self.data["cutup_type"] = 'BMS'
 
             # One small surgical block
-            env.specimen_data[self.name()]['num_blocks'] = 1
+            self.data['num_blocks'] = 1
             self.blocks.append(Block(
                 f'{self.name()}.',
                 env=env,
@@ -75,10 +75,10 @@ class InitSpecimen(Specimen):
 
         elif r < (getattr(env.globals, 'prob_bms_cutup'+suffix) +
                   getattr(env.globals, 'prob_pool_cutup'+suffix)):
-            env.specimen_data[self.name()]["cutup_type"] = 'Pool'
+            self.data["cutup_type"] = 'Pool'
 
             # One large surgical block
-            env.specimen_data[self.name()]['num_blocks'] = 1
+            self.data['num_blocks'] = 1
             self.blocks.append(Block(
                 f'{self.name()}.',
                 env=env,
@@ -88,7 +88,7 @@ class InitSpecimen(Specimen):
             elapsed_time = env.task_durations.cut_up_pool()
 
         else:
-            env.specimen_data[self.name()]["cutup_type"] = 'Large specimens'
+            self.data["cutup_type"] = 'Large specimens'
 
             # Urgent cut-ups never produce megas. Other large surgical blocks produce
             # megas with a given probability.
@@ -99,7 +99,7 @@ class InitSpecimen(Specimen):
                 n_blocks = env.globals.num_blocks_large_surgical()
                 block_type = 'large surgical'
 
-            env.specimen_data[self.name()]['num_blocks'] = n_blocks
+            self.data['num_blocks'] = n_blocks
             for _ in range(n_blocks):
                 block = Block(
                     f'{self.name()}.',
@@ -111,12 +111,12 @@ class InitSpecimen(Specimen):
             elapsed_time = env.task_durations.cut_up_large_specimens()
 
         # End of stage
-        env.specimen_data[self.name()]['bootstrap']['cutup'] = elapsed_time
-        env.specimen_data[self.name()]['bootstrap']['cutup_to_processing'] = (
+        self.data['bootstrap']['cutup'] = elapsed_time
+        self.data['bootstrap']['cutup_to_processing'] = (
             env.processes['cutup_bms_to_processing'].out_duration
-            if env.specimen_data[self.name()]["cutup_type"] == 'BMS'
+            if self.data["cutup_type"] == 'BMS'
             else env.processes['cutup_pool_to_processing'].out_duration
-            if env.specimen_data[self.name()]["cutup_type"] == 'Pool'
+            if self.data["cutup_type"] == 'Pool'
             else env.processes['cutup_large_to_processing'].out_duration
         )
 
@@ -136,14 +136,14 @@ class InitSpecimen(Specimen):
         # Decalc
         r = env.u01()
         if r < env.globals.prob_decalc_bone:
-            env.specimen_data[self.name()]['decalc_type'] = 'bone station'
+            self.data['decalc_type'] = 'bone station'
             elapsed_time += (  # Assume no delay; all blocks decalc'ed simultaneously
                 env.task_durations.load_bone_station()
                 + env.task_durations.decalc()
                 + env.task_durations.unload_bone_station()
             )
         elif r < env.globals.prob_decalc_bone + env.globals.prob_decalc_oven:
-            env.specimen_data[self.name()]['decalc_type'] = 'decalc oven'
+            self.data['decalc_type'] = 'decalc oven'
             elapsed_time += (  # Assume no delay; all blocks decalc'ed simultaneously
                 env.task_durations.load_into_decalc_oven()
                 + env.task_durations.decalc()
@@ -165,8 +165,8 @@ class InitSpecimen(Specimen):
         elapsed_time += env.task_durations.unload_processing_machine()
 
         # End of stage
-        env.specimen_data[self.name()]['bootstrap']['processing'] = elapsed_time
-        env.specimen_data[self.name()]['bootstrap']['processing_to_microtomy'] \
+        self.data['bootstrap']['processing'] = elapsed_time
+        self.data['bootstrap']['processing_to_microtomy'] \
             = env.processes['processing_to_microtomy'].out_duration
 
     def init_microtomy(self) -> None:
@@ -178,7 +178,7 @@ class InitSpecimen(Specimen):
         # Slides are microtomed manually
         # Assume no gaps/delays, total elapsed time will be proportional to the number of blocks
         elapsed_time = 0
-        env.specimen_data[self.name()]['total_slides'] = 0
+        self.data['total_slides'] = 0
 
         for block in self.blocks:
             if block.data['block_type'] == 'small surgical':
@@ -201,19 +201,14 @@ class InitSpecimen(Specimen):
                 num_slides = env.globals.num_slides_megas()
 
             for _ in range(num_slides):
-                slide = Slide(
-                    f'{block.name()}.',
-                    env=env,
-                    parent=block,
-                    slide_type=slide_type
-                )
+                slide = Slide(parent=block, slide_type=slide_type)
                 block.slides.append(slide)
             block.data['num_slides'] = num_slides
-            env.specimen_data[self.name()]['total_slides'] += num_slides
+            self.data['total_slides'] += num_slides
 
         # End of stage
-        env.specimen_data[self.name()]['bootstrap']['microtomy'] = elapsed_time
-        env.specimen_data[self.name()]['bootstrap']['microtomy_to_staining'] \
+        self.data['bootstrap']['microtomy'] = elapsed_time
+        self.data['bootstrap']['microtomy_to_staining'] \
             = env.processes['microtomy_to_staining'].out_duration
 
     def init_staining(self) -> None:
@@ -223,7 +218,7 @@ class InitSpecimen(Specimen):
 
         # Take advantage of the fact all slides will be of the same type
         # Assume all slides can be stained at the same time, with no delays
-        slides_type = self.blocks[0].slides[0].data['slide_type']
+        slides_type = self.blocks[0].slides[0].slide_type
         if slides_type == 'megas':
             elapsed_time = env.task_durations.load_staining_machine_megas()
             elapsed_time += env.task_durations.staining_megas()
@@ -241,8 +236,8 @@ class InitSpecimen(Specimen):
             elapsed_time += env.task_durations.unload_coverslip_machine_regular()
 
         # End of stage
-        env.specimen_data[self.name()]['bootstrap']['staining'] = elapsed_time
-        env.specimen_data[self.name()]['bootstrap']['staining_to_labelling'] \
+        self.data['bootstrap']['staining'] = elapsed_time
+        self.data['bootstrap']['staining_to_labelling'] \
             = env.processes['staining_to_labelling'].out_duration
 
     def init_labelling(self) -> None:
@@ -257,8 +252,8 @@ class InitSpecimen(Specimen):
                 elapsed_time += env.task_durations.labelling()
 
         # End of stage
-        env.specimen_data[self.name()]['bootstrap']['labelling'] = elapsed_time
-        env.specimen_data[self.name()]['bootstrap']['labelling_to_scanning'] \
+        self.data['bootstrap']['labelling'] = elapsed_time
+        self.data['bootstrap']['labelling_to_scanning'] \
             = env.processes['labelling_to_scanning'].out_duration
 
     def init_scanning(self) -> None:
@@ -267,7 +262,7 @@ class InitSpecimen(Specimen):
         env: Model = self.env
 
         # Assume all slides are scanned together
-        slides_type = self.blocks[0].slides[0].data['slide_type']
+        slides_type = self.blocks[0].slides[0].slide_type
         if slides_type == 'megas':
             elapsed_time = env.task_durations.load_scanning_machine_megas()
             elapsed_time += env.task_durations.scanning_megas()
@@ -278,15 +273,15 @@ class InitSpecimen(Specimen):
             elapsed_time += env.task_durations.unload_scanning_machine_regular()
 
         # End of stage
-        env.specimen_data[self.name()]['bootstrap']['scanning'] = elapsed_time
-        env.specimen_data[self.name()]['bootstrap']['scanning_to_qc'] \
+        self.data['bootstrap']['scanning'] = elapsed_time
+        self.data['bootstrap']['scanning_to_qc'] \
             = env.processes['scanning_to_qc'].out_duration
 
     def init_qc(self) -> None:
         """Generate task_durations for specimen that has already completed QC
         at simulation start."""
         env: Model = self.env
-        env.specimen_data[self.name()]['bootstrap']['qc']\
+        self.data['bootstrap']['qc']\
             = env.task_durations.block_and_quality_check()
         # Since scans are digital, no need for physical delivery to histopathologist
 
@@ -295,7 +290,7 @@ class InitSpecimen(Specimen):
         env: Model = self.env
 
         self.insert_point = kwargs.get('insert_point', 'arrive_reception')
-        env.specimen_data[self.name()]['bootstrap']: dict[str, float] = {}
+        self.data['bootstrap']: dict[str, float] = {}
         self.preprocess: dict[str, Callable[[Self], None]] = {
             'reception': self.init_reception,
             'cutup': self.init_cut_up,
@@ -311,7 +306,7 @@ class InitSpecimen(Specimen):
         """Compute mock timestamps for the specimen. These are based on the assumption of no
         delays and provide a minimum possible turnaround time for the mock specimen."""
         env: Model = self.env
-        data = env.specimen_data[self.name()]
+        data = self.data
 
         timestamp = 0
         if 'qc' in data['bootstrap']:
@@ -5,17 +5,23 @@ is necessary for our backend as the Model class is
 not serialisable by the RQ (Redis job queue) module.
 """
 import dataclasses
+import random
 from dataclasses import dataclass
 from typing import Literal
 
 import dacite
+import numpy as np
 import salabim as sim
 
 from . import process
 from .config import Config, DistributionInfo, IntDistributionInfo, ResourceInfo
-from .distributions import PERT, Constant, Distribution, IntPERT, Tri
+from .distributions import PERT, Categorical, Constant, Distribution, IntPERT, Tri
 from .mock_specimens import InitSpecimen
 from .process import ArrivalGenerator, ProcessType, ResourceScheduler
+from .profiling import Profiler
+from .trace import TraceSink
+from .specimen_data import SpecimenData
+from .specimens import Priority
 from .util import dc_items
 
 
@@ -147,6 +153,12 @@ class Model(sim.Environment):
             The number of simulation replications to run the model.
         sim_length (float):
             The duration of each simulation replication.
+        seed_seq (numpy.random.SeedSequence):
+            Root seed sequence of the model's numpy random number generators, seeded from
+            the salabim random stream.
+        rng (numpy.random.Generator):
+            Random number generator for vectorised sampling.  Distributions and arrival
+            generators use their own generators instead (see :py:meth:`spawn_rng`).
         created (float):
             UNIX timestamp of the model configuration's creation time.
         analysis_id (int | None):
@@ -161,6 +173,15 @@ class Model(sim.Environment):
             Dataclass instance containing global variables for the model.
         completed_specimens (salabim.Store):
             A store containing completed specimens, so that statistics can be computed.
+            Completed specimens are not kept if ``trace_only`` is set.
+        specimen_data (hpath_backend.specimen_data.SpecimenData):
+            Columnar store of specimen data, including stage timestamps.
+        source_dist (hpath_backend.distributions.Categorical[str]):
+            Distribution of specimen sources, i.e. "Internal" or "External".
+        priority_dists (dict[str, hpath_backend.distributions.Categorical[Priority]]):
+            Distributions of specimen priorities, keyed by pathway ("cancer" or "non_cancer").
+        profiler (hpath_backend.profiling.Profiler | None):
+            Profiler collecting per-process counters, if profiling is enabled.
         wips (Wips):
             Dataclass instance containing work-in-progress counters for the model.
         processes (dict[str, hpath.process.Process |
@@ -175,7 +196,13 @@ class Model(sim.Environment):
             config (hpath.config.Config):
                 Configuration settings for the simulation model.
             kwargs:
-                Additional parameters absorbed by the super() constructor.
+                Additional parameters absorbed by the super() constructor.  Pass
+                ``profile=True`` to enable profiling (see :py:mod:`hpath_backend.profiling`),
+                or ``trace_path=<path>`` to stream specimen stage events to an Arrow IPC or
+                Parquet file (see :py:mod:`hpath_backend.trace`).  With ``trace_only=True``,
+                stage timestamps are only written to the trace file, so that memory use does
+                not grow with the simulation length, but KPIs cannot be computed from the
+                model.
         """
 
         # Change super() defaults
@@ -183,12 +210,23 @@ class Model(sim.Environment):
         kwargs['random_seed'] = kwargs.get('random_seed', '*')
         super().__init__(**kwargs, config=config)
 
-    def setup(self, config: Config) -> None:  # pylint: disable=arguments-differ
+    def setup(  # pylint: disable=arguments-differ
+            self, config: Config, profile: bool = False, trace_path: str | None = None,
+            trace_only: bool = False) -> None:
         super().setup()
 
+        # PROFILING (optional)
+        self.profiler = Profiler(self) if profile else None
+
         self.num_reps: int = config.num_reps
         self.sim_length: float = self.env.hours(config.sim_hours)
 
+        # RANDOM NUMBER GENERATORS
+        # Seeded from the salabim random stream, so that results remain
+        # reproducible from the ``random_seed`` of the model
+        self.seed_seq = np.random.SeedSequence(random.getrandbits(64))
+        self.rng = np.random.default_rng(self.seed_seq)
+
         # ARRIVALS
         ArrivalGenerator(
             'Arrival Generator (cancer)',
@@ -230,9 +268,11 @@ class Model(sim.Environment):
         for key, val in iter(config.task_durations_info):
             val: DistributionInfo
             task_durations[key] = (
-                PERT(val.low, val.mode, val.high, time_unit_full(val.time_unit), env=self)
+                PERT(val.low, val.mode, val.high, time_unit_full(val.time_unit), env=self,
+                     rng=self.spawn_rng(f'task_durations.{key}'))
                 if val.type == 'PERT' else
-                Tri(val.low, val.mode, val.high, time_unit_full(val.time_unit), env=self)
+                Tri(val.low, val.mode, val.high, time_unit_full(val.time_unit), env=self,
+                    rng=self.spawn_rng(f'task_durations.{key}'))
                 if val.type == 'Triangular' else
                 Constant(val.mode, time_unit_full(val.time_unit), env=self)
             )
@@ -241,13 +281,16 @@ class Model(sim.Environment):
         self.batch_sizes = config.batch_sizes
 
         # GLOBALS
-        self.globals = config.global_vars
+        # Copy, as distribution objects bound to this model replace some fields below
+        self.globals = config.global_vars.model_copy()
         # Currently, only the IntPERT distribution is used in self.globals --
         # Convert these to distribution objects
         for key, val in iter(self.globals):
             if isinstance(val, IntDistributionInfo):
                 if val.type == 'IntPERT':
-                    setattr(self.globals, key, IntPERT(val.low, val.mode, val.high, env=self))
+                    setattr(self.globals, key,
+                            IntPERT(val.low, val.mode, val.high, env=self,
+                                    rng=self.spawn_rng(f'globals.{key}')))
                 else:
                     raise ValueError(f'Distribution type {val.type} not (yet) supported.')
 
@@ -258,7 +301,12 @@ class Model(sim.Environment):
         )
 
         # SPECIMEN DATA
-        self.specimen_data: dict[str, dict] = {}
+        self.specimen_data = SpecimenData()
+        if trace_path is not None:
+            self.specimen_data.sink = TraceSink(trace_path)
+            self.specimen_data.keep_times = not trace_only
+        elif trace_only:
+            raise ValueError('trace_only requires a trace_path.')
 
         # WORK-IN-PROGRESS COUNTERS
         self.wips = Wips(self)
@@ -278,6 +326,18 @@ class Model(sim.Environment):
 
         # FREQUENTLY USED DISTRIBUTIONS
         self.u01 = sim.Uniform(0, 1, time_unit=None, env=self)
+        self.source_dist: Categorical[str] = Categorical(
+            ('Internal', 'External'), (self.globals.prob_internal, 1)
+        )
+        self.priority_dists: dict[str, Categorical[Priority]] = {}
+        for dist in ('cancer', 'non_cancer'):
+            prob_urgent = getattr(self.globals, 'prob_urgent_' + dist)
+            prob_priority = getattr(self.globals, 'prob_priority_' + dist)
+            self.priority_dists[dist] = Categorical(
+                (Priority.URGENT, Priority.PRIORITY,
+                 Priority.CANCER if dist == 'cancer' else Priority.ROUTINE),
+                (prob_urgent, prob_urgent + prob_priority, 1)
+            )
 
         # INITIAL SPECIMENS (MOCK)
         stages = ['reception', 'cutup', 'processing', 'microtomy', 'staining',
@@ -307,17 +367,16 @@ class Model(sim.Environment):
                         for stage2 in stages[:idx]:
                             specimen.preprocess[stage2]()
                         specimen.compute_timestamps()
-                        self.specimen_data[specimen.name()]['insert_point'] = insert_point
+                        specimen.data['insert_point'] = insert_point
 
                         init_specimens.append(specimen)
 
             # Sort by time
-            init_specimens.sort(key=lambda item: 
-                                self.specimen_data[item.name()].get('reception_start', self.now()))
+            init_specimens.sort(key=lambda item: item.data.get('reception_start', self.now()))
 
             # Insert mock specimens
             for specimen in init_specimens:
-                insert_point = self.specimen_data[specimen.name()]['insert_point']
+                insert_point = specimen.data['insert_point']
                 if insert_point == 'arrive_reception':
                     self.processes[insert_point].in_queue.add(specimen)
                 else:
@@ -329,6 +388,26 @@ class Model(sim.Environment):
         if config.opt_runner_times:
             self.runner_times = config.runner_times
 
+    def spawn_rng(self, name: str) -> np.random.Generator:
+        """Return an independent random number generator for the named distribution or
+        process.  The generator's stream depends only on the model's random seed and on
+        ``name``, so adding distributions or changing buffer sizes leaves the streams of
+        other distributions unchanged."""
+        child = np.random.SeedSequence(self.seed_seq.entropy, spawn_key=tuple(name.encode()))
+        return np.random.default_rng(child)
+
     def run(self) -> None:  # pylint: disable=arguments-differ
-        """Run the simulation for the duration set in ``self.sim_length``."""
-        super().run(duration=self.sim_length)
+        """Run the simulation for the duration set in ``self.sim_length``.  If tracing is
+        enabled, the trace file is closed at the end of the run, even if the run fails, so a
+        traced model can only be run once."""
+        sink = self.specimen_data.sink
+        if sink is None:
+            super().run(duration=self.sim_length)
+            return
+        if sink.closed:
+            raise RuntimeError(f'Trace file {sink.path} is already closed; '
+                               'a traced model can only be run once.')
+        try:
+            super().run(duration=self.sim_length)
+        finally:
+            sink.close()
@@ -2,13 +2,16 @@
 These definitions are exported to the top level of histopath.process
 using the ``__all__`` keyword."""
 
+import bisect
 import itertools
+from collections.abc import Sequence
 from typing import TYPE_CHECKING, Type, Union, Callable
 
+import numpy as np
 import salabim as sim
 from salabim import Environment
 
-from ..specimens import Batch, Component, Priority, Specimen
+from ..specimens import Batch, Component, Priority, Slide, Specimen
 from ..util import ARR_RATE_INTERVAL_HOURS, RESOURCE_ALLOCATION_INTERVAL_HOURS
 
 if TYPE_CHECKING:
@@ -19,9 +22,14 @@ if TYPE_CHECKING:
 class ArrivalGenerator(Component):
     """:py:class:`~histopath.specimens.Specimen` arrival generator process.
 
+    The full sequence of arrival times over the simulation horizon is generated up front as
+    a non-homogeneous Poisson process (NHPP) with piecewise-constant rates, using the
+    random number generator of the model. The process then walks this array, creating one
+    :py:class:`~histopath.specimens.Specimen` per arrival.
+
     Attributes:
-        iterator (itertools.cycle):
-            Iterator yielding the arrival rate for each hourly period.
+        arrival_times (numpy.ndarray):
+            Sorted array of specimen arrival times, in simulation time units.
         cls_args (dict[str, typing.Any]):
             Arguments passed to the :py:class:`~histopath.specimens.Specimen` constructor.
     """
@@ -51,33 +59,69 @@ class ArrivalGenerator(Component):
         rather than overriding ``__init__()``. The method is called automatically
         immediately after initialisation."""
         super().setup()
-        self.iterator = itertools.cycle(rates)
+        env: 'Model' = self.env
+        hour = env.hours(1)
+        self.arrival_times = hour * self.nhpp_arrivals(
+            rates, env.sim_length / hour, env.spawn_rng(self.name()), ARR_RATE_INTERVAL_HOURS
+        )
         self.cls_args = kwargs
 
+    @staticmethod
+    def nhpp_arrivals(
+            rates: Sequence[float],
+            duration: float,
+            rng: np.random.Generator,
+            interval: float = 1) -> np.ndarray:
+        """Generate the arrival times of a non-homogeneous Poisson process by piecewise
+        inversion of its cumulative intensity function.
+
+        Args:
+            rates (Sequence[float]):
+                Arrival rates for consecutive intervals, cycled to cover ``duration``.
+            duration (float): Length of the time horizon.
+            rng (numpy.random.Generator): Random number generator.
+            interval (float): Length of each rate interval. Defaults to 1.
+
+        Returns:
+            numpy.ndarray: Sorted arrival times in ``[0, duration)``.
+        """
+        num_intervals = int(np.ceil(duration / interval))
+        if num_intervals == 0 or len(rates) == 0:
+            return np.empty(0)
+        rate = np.resize(np.asarray(rates, dtype=float), num_intervals)
+        # Truncate the last interval at the end of the time horizon
+        width = np.full(num_intervals, float(interval))
+        width[-1] = duration - interval * (num_intervals - 1)
+        cum_intensity = np.concatenate(([0.0], np.cumsum(rate * width)))
+
+        # Arrivals of a unit-rate Poisson process on [0, total intensity)...
+        num_arrivals = rng.poisson(cum_intensity[-1])
+        unit_times = np.sort(rng.uniform(0, cum_intensity[-1], num_arrivals))
+
+        # ...mapped back to real time. Intervals with zero rate have zero width in the
+        # transformed time, so side='right' never places arrivals in them.
+        idx = np.searchsorted(cum_intensity, unit_times, side='right') - 1
+        return interval * idx + (unit_times - cum_intensity[idx]) / rate[idx]
+
     def process(self) -> None:
-        """The generator process. Creates a sub-generator for
-        each interval (of length `ARR_RATE_INTERVAL_HOURS`) with the specified rate."""
-        for rate in self.iterator:
-            if rate > 0:
-                sim.ComponentGenerator(
-                    Specimen,
-                    generator_name=self.name(),
-                    duration=self.env.hours(ARR_RATE_INTERVAL_HOURS),
-                    iat=sim.Exponential(rate=rate, time_unit="hours", env=self.env),
-                    env=self.env,
-                    **self.cls_args
-                )
-            self.hold(duration=self.env.hours(ARR_RATE_INTERVAL_HOURS))
+        """The generator process. Creates a specimen at each arrival time."""
+        for time in self.arrival_times:
+            self.hold(till=time)
+            Specimen(env=self.env, **self.cls_args)
 
 
 class ResourceScheduler(Component):
-    """:py:class:`~salabim.Resource` scheduler process.  The resource level is set every
-    half-hour. The resource level is set to 0 if the day entry in the
-    `ResourceSchedule` is 0.
+    """:py:class:`~salabim.Resource` scheduler process.  The resource level is given for
+    every half-hour, and is set to 0 if the day entry in the `ResourceSchedule` is 0.
+    The weekly schedule is compiled into a run-length list of change points, so that the
+    scheduler only wakes when the resource level actually changes.
 
     Attributes:
         resource (salabim.Resource): The resource to control the allocation of.
         schedule (ResourceSchedule): The resource schedule in dataclass form.
+        change_points (list[tuple[float, int]]):
+            The weekly schedule as a list of ``(delta_t, capacity)`` pairs, where the
+            resource level is set to ``capacity`` for the next ``delta_t`` time units.
         env (Model): The simulation model this arrival generator is attached to.
     """
 
@@ -111,19 +155,34 @@ class ResourceScheduler(Component):
         super().setup()
         self.resource = resource
         self.schedule = schedule
+        self.change_points = [
+            (self.env.hours(delta_t), capacity)
+            for delta_t, capacity in self.compile_schedule(schedule)
+        ]
+
+    @staticmethod
+    def compile_schedule(schedule: 'ResourceSchedule') -> list[tuple[float, int]]:
+        """Compile a weekly resource schedule into a run-length list of
+        ``(delta_t, capacity)`` pairs, with ``delta_t`` in hours.  Consecutive
+        intervals with the same resource level are merged."""
+        change_points: list[tuple[float, int]] = []
+        for day_flag in schedule.day_flags:
+            for allocation in (schedule.allocation if day_flag else [0]*len(schedule.allocation)):
+                if change_points and change_points[-1][1] == allocation:
+                    change_points[-1] = (
+                        change_points[-1][0] + RESOURCE_ALLOCATION_INTERVAL_HOURS, allocation
+                    )
+                else:
+                    change_points.append((RESOURCE_ALLOCATION_INTERVAL_HOURS, allocation))
+        return change_points
 
     def process(self) -> None:
-        """Change the resource capacity based on the schedule.
-        Capacities are given in 30-min intervals."""
-        for day_flag in itertools.cycle(self.schedule.day_flags):
-            if day_flag == 0:
-                self.resource.set_capacity(0)
-                self.hold(self.env.days(1))
-            else:
-                for allocation in self.schedule.allocation:
-                    if allocation != self.resource.capacity() or self.env.now() == 0:
-                        self.resource.set_capacity(allocation)
-                    self.hold(self.env.hours(RESOURCE_ALLOCATION_INTERVAL_HOURS))
+        """Change the resource capacity based on the schedule, holding until the
+        next change point."""
+        for delta_t, capacity in itertools.cycle(self.change_points):
+            if capacity != self.resource.capacity() or self.env.now() == 0:
+                self.resource.set_capacity(capacity)
+            self.hold(delta_t)
 
 
 class Process(sim.Component):
@@ -167,6 +226,9 @@ class Process(sim.Component):
         super().setup()
 
         # point <in_type>.<name> to fn, where <name> is the process name
+        env: Model = self.env
+        if env.profiler is not None:
+            fn = env.profiler.wrap(self.name(), fn)
         self.in_type = in_type
         setattr(self.in_type, self.name(), fn)
 
@@ -184,6 +246,8 @@ class Process(sim.Component):
 class BatchingProcess(Component):
     """Takes ``batch_size`` entites from ``in_queue`` and inserts a single
     instance of ``out_type`` to ``env.processes[out_process].in_queue``.
+    Entities that are not salabim components, e.g. :py:class:`~hpath_backend.specimens.Slide`
+    instances, are added using :py:meth:`put` instead of entering ``in_queue``.
 
     Attributes:
         batch_size (int | typing.Callable[[], int]):
@@ -195,6 +259,7 @@ class BatchingProcess(Component):
             Must contain an attribute ``items`` (a list).
         out_process (str): The name of the process receiving the batch.
         env (Model): The simulation model this arrival generator is attached to.
+        batch (Batch | None): The batch currently being filled, if any.
     """
 
     def __init__(self, *args,
@@ -234,25 +299,53 @@ class BatchingProcess(Component):
         self.out_type = out_type
         self.out_process = out_process
         self.batch_args = kwargs
+        self.batch: Batch | None = None
+        self._target_size = 0
+        self._priorities: list[float] = []  # Priorities of the items in the current batch
 
     def process(self) -> None:
         """The batching loop."""
-        env: Model = self.env
         while True:
-            batch_size = self.batch_size() if callable(self.batch_size) else self.batch_size
-            batch = self.out_type(**self.batch_args)
-            for _ in range(batch_size):
-                self.from_store(self.in_queue)
-                item = self.from_store_item()
-                item.register(batch.items)
-            batch.enter(env.processes[self.out_process].in_queue)
+            self.from_store(self.in_queue)
+            self.put(self.from_store_item())
+
+    def put(self, item: Component | Slide, priority: float | None = None) -> None:
+        """Add an item to the current batch directly, bypassing ``in_queue``.  Once the batch
+        is full, it is inserted into ``env.processes[out_process].in_queue``.
+
+        Args:
+            item (Component | Slide): The item to add.
+            priority (float | None):
+                If given, the item is placed in the batch after all items with the same or a
+                lower priority value, as for :py:meth:`salabim.Component.enter_sorted`.
+                Otherwise, the item is placed at the end of the batch, as for
+                :py:meth:`salabim.Component.enter`.
+        """
+        env: Model = self.env
+        if self.batch is None:
+            self._target_size = (self.batch_size() if callable(self.batch_size)
+                                 else self.batch_size)
+            self.batch = self.out_type(**self.batch_args)
+            self._priorities.clear()
+        if priority is None:
+            # As salabim, take the priority of the last item
+            priority = self._priorities[-1] if self._priorities else 0
+        index = bisect.bisect_right(self._priorities, priority)
+        self._priorities.insert(index, priority)
+        self.batch.items.insert(index, item)
+        if len(self.batch.items) >= self._target_size:
+            self.batch.enter(env.processes[self.out_process].in_queue)
+            self.batch = None
 
 
 class CollationProcess(Component):
-    """Takes entities from ``in_queue`` and places them into a pool.
+    """Takes entities from ``in_queue`` and counts them against their parent.
     Once all entities with the same parent are found (based on comparing
     with a counter), the parent is inserted into
-    ``env.processes[out_process].in_queue``.
+    ``env.processes[out_process].in_queue``.  The number of outstanding entities is
+    tracked in ``parent.pending``, so no pool of entities is kept.
+    Entities that are not salabim components, e.g. :py:class:`~hpath_backend.specimens.Slide`
+    instances, are added using :py:meth:`put` instead of entering ``in_queue``.
 
     Attributes:
         counter_name (str):
@@ -294,38 +387,42 @@ class CollationProcess(Component):
         self.counter_name = counter_name
         self.in_queue = sim.Store(name=f'{self.name()}.in_queue', env=self.env)
         self.out_process = out_process
-        self.dict: dict[str, list[Component]] = {}
 
     def process(self) -> None:
         """The collation loop."""
-        env: Model = self.env
         while True:
             self.from_store(self.in_queue)
-            item: Component = self.from_store_item()
-            key = item.parent.name()
-            if key not in self.dict:
-                self.dict[key] = []
-            self.dict[key].append(item)
-
-            # Check counter to see if we have all items in the group
-            data = (
-                env.specimen_data[item.parent.name()] if isinstance(item.parent, Specimen)
-                else item.parent.data
-            )
-            if len(self.dict[key]) ==\
-                    data[self.counter_name]:
-                item.parent.enter_sorted(env.processes[self.out_process].in_queue, item.parent)
-                del self.dict[key]
-
-
-class DeliveryProcess(Component):
-    """Takes entities/batches from the `in_queue` and places them
-    in `env.processes[out_process].in_queue`, after some delay.
-    A resource is required to move the entity/batch and requires
-    time to travel between the locations associated with the two
-    processes.  Batches are unbatched upon arrival.
+            self.put(self.from_store_item())
+
+    def put(self, item: Component | Slide) -> None:
+        """Collate an item directly, bypassing ``in_queue``."""
+        parent = item.parent
+        if parent.pending == 0:
+            # First item of the group
+            parent.pending = parent.data[self.counter_name]
+        parent.pending -= 1
+
+        # Release the parent once all items in the group have arrived
+        if parent.pending == 0:
+            env: Model = self.env
+            parent.enter_sorted(env.processes[self.out_process].in_queue, parent.prio)
+
+
+class BatchDeliveryProcess(Component):
+    """Collects entities into batches of ``batch_size`` and delivers each full batch to
+    ``env.processes[out_process].in_queue``, after some delay.  A resource is required to
+    move each delivery and requires time to travel between the locations associated with
+    the two processes.  Batches are unbatched upon arrival.
+
+    Entities to be batched are added using :py:meth:`put`.  Entities entering ``in_queue``
+    directly (e.g. Urgent specimens) are delivered individually, with their own priority.
+    Batch containers are taken from a pool and returned to it after unloading, so no new
+    :py:class:`~hpath_backend.specimens.Batch` instances are created in steady state.
 
     Attributes:
+        batch_size (int | typing.Callable[[], int]):
+            The batch size or its distribution.  Can take `salabim` distributions or any
+            other type with ``__call__`` implemented.
         runner (salabim.Resource):
             The resource (e.g. staff) responsible for the delivery.
         out_duration (float | typing.Callable[[], float]):
@@ -336,12 +433,14 @@ class DeliveryProcess(Component):
             Acceptable types are those accepted by :py:meth:`salabim.Component.hold`.
         out_process (str):
             The name of the process receiving the delivery.
+        in_queue (salabim.Store):
+            The in-queue of the process, containing full batches and individual deliveries.
+        batch (Batch | None): The batch currently being filled, if any.
         env (Model): The simulation model this arrival generator is attached to.
     """
 
-    # NOTE: Add additional delivery resources, e.g. a trolley, in the future?
-
     def __init__(self, *args,
+                 batch_size: int | Callable[[], int],
                  runner: sim.Resource,
                  out_duration: float | Callable[[], float],
                  return_duration: float | Callable[[], float],
@@ -354,6 +453,7 @@ class DeliveryProcess(Component):
             args (dict[str, typing.Any]):
                 Positional arguments passed to the :py:class:`super() <salabim.Component>`
                 constructor.
+            batch_size (int | typing.Callable[[], int])
             runner (sim.Resource)
             out_duration (float | Callable[[], float])
             return_duration (float | Callable[[], float])
@@ -364,24 +464,42 @@ class DeliveryProcess(Component):
                 constructor.
         """
         # super().__init__ consumes args and a bunch of kwargs and passes the rest to setup()
-        super().__init__(*args, **kwargs, env=env, runner=runner, out_duration=out_duration,
-                         return_duration=return_duration, out_process=out_process)
+        super().__init__(*args, **kwargs, env=env, batch_size=batch_size, runner=runner,
+                         out_duration=out_duration, return_duration=return_duration,
+                         out_process=out_process)
 
     def setup(  # pylint: disable=arguments-differ
         self,
+        batch_size: int | Callable[[], int],
         runner: sim.Resource,
         out_duration: float | sim.Distribution,
         return_duration: float | sim.Distribution,
         out_process: str
     ) -> None:
-        """Set up the `DeliveryProcess`. Salabim encourages use of a ``setup()`` method
+        """Set up the `BatchDeliveryProcess`. Salabim encourages use of a ``setup()`` method
         rather than overriding ``__init__()``. The method is called automatically
         immediately after initialisation."""
         self.in_queue = sim.Store(name=f'{self.name()}.in_queue', env=self.env)
+        self.batch_size = batch_size
         self.runner = runner
         self.out_duration = out_duration
         self.return_duration = return_duration
         self.out_process = out_process
+        self.batch: Batch | None = None
+        self._target_size = 0
+        self._pool: list[Batch] = []
+
+    def put(self, item: Component) -> None:
+        """Add an item to the current batch.  Once the batch is full, it is queued for
+        delivery."""
+        if self.batch is None:
+            self._target_size = (self.batch_size() if callable(self.batch_size)
+                                 else self.batch_size)
+            self.batch = self._pool.pop() if self._pool else Batch(env=self.env)
+        self.batch.items.append(item)
+        if len(self.batch.items) >= self._target_size:
+            self.batch.enter(self.in_queue)
+            self.batch = None
 
     def process(self) -> None:
         """The delivery loop."""
@@ -391,29 +509,27 @@ class DeliveryProcess(Component):
         while True:
             self.from_store(self.in_queue)
             entity: Component = self.from_store_item()
+            is_batch = isinstance(entity, Batch)
 
             # Deliveries of single items are given the priority of that item (expected to be URGENT)
-            delivery_prio = (entity.prio if not isinstance(entity, Batch)
-                             else Priority.ROUTINE)
+            delivery_prio = Priority.ROUTINE if is_batch else entity.prio
 
             self.request((self.runner, 1, delivery_prio))
             self.hold(self.out_duration)
 
-            # Unload delivery items
-            if isinstance(entity, Batch):
+            # Unload delivery items and return the batch container to the pool
+            if is_batch:
                 item: Component
                 for item in entity.items:
-                    item.enter_sorted(
-                        out_queue,
-                        priority=item.prio)
+                    item.enter_sorted(out_queue, priority=item.prio)
+                entity.items.clear()
+                self._pool.append(entity)
             else:
-                entity.enter_sorted(
-                    out_queue,
-                    priority=entity.prio)
+                entity.enter_sorted(out_queue, priority=entity.prio)
 
             # return runner to origin station
             self.hold(self.return_duration)
             self.release()
 
 
-ProcessType = Union[Process, BatchingProcess, CollationProcess, DeliveryProcess]
+ProcessType = Union[Process, BatchingProcess, CollationProcess, BatchDeliveryProcess]
@@ -17,19 +17,20 @@ performs work on these entities, and places the transformed entities onto an out
     - The :py:class:`CollationProcess` class searches for entities with the same parent
       and pushes the parent entity to the output queue when all sibling entities are
       found.
-    - The :py:class:`DeliveryProcess` class represents deliveries of entities or batches.
-      Batches are automatically unpacked when arriving at the output queue.
+    - The :py:class:`BatchDeliveryProcess` class represents deliveries of entities or
+      batches, collecting entities into pooled batch containers and delivering each full
+      batch.  Batches are automatically unpacked when arriving at the output queue.
 
 This module also defines the :py:class:`ArrivalGenerator` and :py:class:`ResourceScheduler` classes.
 """
 from . import (p10_reception, p20_cutup, p30_processing, p40_microtomy,
                p50_staining, p60_labelling, p70_scanning, p80_qc, p90_reporting)
-from .__core import (ArrivalGenerator, BatchingProcess, CollationProcess,
-                     DeliveryProcess, Process, ProcessType, ResourceScheduler)
+from .__core import (ArrivalGenerator, BatchDeliveryProcess, BatchingProcess,
+                     CollationProcess, Process, ProcessType, ResourceScheduler)
 
 __all__ = [
-    'ArrivalGenerator', 'BatchingProcess', 'CollationProcess', 'DeliveryProcess', 'Process',
-    'ProcessType', 'ResourceScheduler',
+    'ArrivalGenerator', 'BatchDeliveryProcess', 'BatchingProcess', 'CollationProcess',
+    'Process', 'ProcessType', 'ResourceScheduler',
     'p10_reception', 'p20_cutup', 'p30_processing', 'p40_microtomy', 'p50_staining',
     'p60_labelling', 'p70_scanning', 'p80_qc', 'p90_reporting'
 ]
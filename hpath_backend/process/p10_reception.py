@@ -3,7 +3,7 @@
 from typing import TYPE_CHECKING
 
 from ..specimens import Priority, Specimen
-from .__core import Batch, BatchingProcess, DeliveryProcess, Process
+from .__core import BatchDeliveryProcess, Process
 
 if TYPE_CHECKING:
     from ..model import Model
@@ -17,16 +17,10 @@ def register(env: 'Model') -> None:
     env.processes['booking_in'] = Process(
         'booking_in', env=env, in_type=Specimen, fn=booking_in
     )
-    env.processes['batcher.reception_to_cutup'] = BatchingProcess(
-        'batcher.reception_to_cutup',
-        env=env,
-        batch_size=env.batch_sizes.deliver_reception_to_cut_up,
-        out_type=Batch[Specimen],
-        out_process='reception_to_cutup'
-    )
-    env.processes['reception_to_cutup'] = DeliveryProcess(
+    env.processes['reception_to_cutup'] = BatchDeliveryProcess(
         'reception_to_cutup',
         env=env,
+        batch_size=env.batch_sizes.deliver_reception_to_cut_up,
         runner=env.resources.booking_in_staff,
         out_duration=env.minutes(2),
         return_duration=env.minutes(2),
@@ -41,7 +35,7 @@ def arrive_reception(self: Specimen) -> None:
     env.wips.total.value += 1
     env.wips.in_reception.value += 1
 
-    env.specimen_data[self.name()]['reception_start'] = env.now()
+    env.specimen_data.set_time(self.row, 'reception_start', env.now())
 
     # For booking-in staff, receiving new specimens always takes priority
     # over all non-urgent booking-in tasks
@@ -62,13 +56,13 @@ def booking_in(self: Specimen) -> None:
         self.hold(env.task_durations.pre_booking_in_investigation)
 
     # Booking-in
-    if env.specimen_data[self.name()]['source'] == 'Internal':
+    if self.source == 'Internal':
         self.hold(env.task_durations.booking_in_internal)
     else:
         self.hold(env.task_durations.booking_in_external)
 
     # Additional investigation
-    if env.specimen_data[self.name()]['source'] == 'Internal':
+    if self.source == 'Internal':
         r = env.u01()
 
         if r < env.globals.prob_invest_easy:
@@ -81,11 +75,11 @@ def booking_in(self: Specimen) -> None:
 
     # Booking-in complete
     self.release()
-    env.specimen_data[self.name()]['reception_end'] = env.now()
+    env.specimen_data.set_time(self.row, 'reception_end', env.now())
     env.wips.in_reception.value -= 1
 
     # Deliver to next stage: individually for Urgents, batched otherwise.
     if self.prio == Priority.URGENT:
         self.enter_sorted(env.processes['reception_to_cutup'].in_queue, Priority.URGENT)
     else:
-        self.enter(env.processes['batcher.reception_to_cutup'].in_queue)
+        env.processes['reception_to_cutup'].put(self)
@@ -6,7 +6,7 @@
 from typing import TYPE_CHECKING
 
 from ..specimens import Block, Priority, Specimen
-from .__core import Batch, BatchingProcess, DeliveryProcess, Process
+from .__core import BatchDeliveryProcess, Process
 
 if TYPE_CHECKING:
     from ..model import Model
@@ -23,16 +23,10 @@ def register(env: 'Model') -> None:
     env.processes['cutup_bms'] = Process(
         'cutup_bms', env=env, in_type=Specimen, fn=cutup_bms
     )
-    env.processes['batcher.cutup_bms_to_processing'] = BatchingProcess(
-        'batcher.cutup_bms_to_processing',
-        env=env,
-        batch_size=env.batch_sizes.deliver_cut_up_to_processing,
-        out_type=Batch[Specimen],
-        out_process='cutup_bms_to_processing'
-    )
-    env.processes['cutup_bms_to_processing'] = DeliveryProcess(
+    env.processes['cutup_bms_to_processing'] = BatchDeliveryProcess(
         'cutup_bms_to_processing',
         env=env,
+        batch_size=env.batch_sizes.deliver_cut_up_to_processing,
         runner=env.resources.bms,
         out_duration=env.minutes(2),
         return_duration=env.minutes(2),
@@ -43,16 +37,10 @@ def register(env: 'Model') -> None:
     env.processes['cutup_pool'] = Process(
         'cutup_pool', env=env, in_type=Specimen, fn=cutup_pool
     )
-    env.processes['batcher.cutup_pool_to_processing'] = BatchingProcess(
-        'batcher.cutup_pool_to_processing',
-        env=env,
-        batch_size=env.batch_sizes.deliver_cut_up_to_processing,
-        out_type=Batch[Specimen],
-        out_process='cutup_pool_to_processing'
-    )
-    env.processes['cutup_pool_to_processing'] = DeliveryProcess(
+    env.processes['cutup_pool_to_processing'] = BatchDeliveryProcess(
         'cutup_pool_to_processing',
         env=env,
+        batch_size=env.batch_sizes.deliver_cut_up_to_processing,
         runner=env.resources.cut_up_assistant,
         out_duration=env.minutes(2),
         return_duration=env.minutes(2),
@@ -63,16 +51,10 @@ def register(env: 'Model') -> None:
     env.processes['cutup_large'] = Process(
         'cutup_large', env=env, in_type=Specimen, fn=cutup_large
     )
-    env.processes['batcher.cutup_large_to_processing'] = BatchingProcess(
-        'batcher.cutup_large_to_processing',
-        env=env,
-        batch_size=env.batch_sizes.deliver_cut_up_to_processing,
-        out_type=Batch[Specimen],
-        out_process='cutup_large_to_processing'
-    )
-    env.processes['cutup_large_to_processing'] = DeliveryProcess(
+    env.processes['cutup_large_to_processing'] = BatchDeliveryProcess(
         'cutup_large_to_processing',
         env=env,
+        batch_size=env.batch_sizes.deliver_cut_up_to_processing,
         runner=env.resources.cut_up_assistant,
         out_duration=env.minutes(2),
         return_duration=env.minutes(2),
@@ -84,7 +66,7 @@ def cutup_start(self: Specimen) -> None:
     """Take specimens arriving at cut-up and sort to the correct cut-up queue."""
     env: Model = self.env
     env.wips.in_cut_up.value += 1
-    env.specimen_data[self.name()]['cutup_start'] = env.now()
+    env.specimen_data.set_time(self.row, 'cutup_start', env.now())
 
     r = env.u01()
     suffix = '_urgent' if self.prio == Priority.URGENT else ''
@@ -96,7 +78,7 @@ def cutup_start(self: Specimen) -> None:
     else:
         cutup_type, next_process = 'Large specimens', 'cutup_large'
 
-    env.specimen_data[self.name()]["cutup_type"] = cutup_type
+    env.specimen_data.set_value(self.row, 'cutup_type', cutup_type)
     self.enter_sorted(env.processes[next_process].in_queue, self.prio)
 
 
@@ -113,16 +95,16 @@ def cutup_bms(self: Specimen) -> None:
         block_type='small surgical'
     )
     self.blocks.append(block)
-    env.specimen_data[self.name()]['num_blocks'] = 1
+    env.specimen_data.set_value(self.row, 'num_blocks', 1)
 
     self.release()
     env.wips.in_cut_up.value -= 1
-    env.specimen_data[self.name()]['cutup_end'] = env.now()
+    env.specimen_data.set_time(self.row, 'cutup_end', env.now())
 
     if self.prio == Priority.URGENT:
         self.enter(env.processes['cutup_bms_to_processing'].in_queue)
     else:
-        self.enter(env.processes['batcher.cutup_bms_to_processing'].in_queue)
+        env.processes['cutup_bms_to_processing'].put(self)
 
 
 def cutup_pool(self: Specimen) -> None:
@@ -138,16 +120,16 @@ def cutup_pool(self: Specimen) -> None:
         block_type='large surgical'
     )
     self.blocks.append(block)
-    env.specimen_data[self.name()]['num_blocks'] = 1
+    env.specimen_data.set_value(self.row, 'num_blocks', 1)
 
     self.release()
     env.wips.in_cut_up.value -= 1
-    env.specimen_data[self.name()]['cutup_end'] = env.now()
+    env.specimen_data.set_time(self.row, 'cutup_end', env.now())
 
     if self.prio == Priority.URGENT:
         self.enter_sorted(env.processes['cutup_pool_to_processing'].in_queue, Priority.URGENT)
     else:
-        self.enter(env.processes['batcher.cutup_pool_to_processing'].in_queue)
+        env.processes['cutup_pool_to_processing'].put(self)
 
 
 def cutup_large(self: Specimen) -> None:
@@ -176,13 +158,13 @@ def cutup_large(self: Specimen) -> None:
         )
         self.blocks.append(block)
 
-    env.specimen_data[self.name()]['num_blocks'] = n_blocks
+    env.specimen_data.set_value(self.row, 'num_blocks', n_blocks)
 
     self.release()
     env.wips.in_cut_up.value -= 1
-    env.specimen_data[self.name()]['cutup_end'] = env.now()
+    env.specimen_data.set_time(self.row, 'cutup_end', env.now())
 
     if self.prio == Priority.URGENT:
         self.enter_sorted(env.processes['cutup_large_to_processing'].in_queue, Priority.URGENT)
     else:
-        self.enter(env.processes['batcher.cutup_large_to_processing'].in_queue)
+        env.processes['cutup_large_to_processing'].put(self)
@@ -9,8 +9,8 @@
 from typing import TYPE_CHECKING
 
 from ..specimens import Block, Priority, Specimen
-from .__core import (Batch, BatchingProcess, CollationProcess, DeliveryProcess,
-                     Process)
+from .__core import (Batch, BatchDeliveryProcess, BatchingProcess,
+                     CollationProcess, Process)
 
 if TYPE_CHECKING:
     from ..model import Model
@@ -106,16 +106,10 @@ def register(env: 'Model') -> None:
     )
 
     # DELIVERY
-    env.processes['batcher.processing_to_microtomy'] = BatchingProcess(
-        'batcher.processing_to_microtomy',
-        env=env,
-        batch_size=env.batch_sizes.deliver_processing_to_microtomy,
-        out_type=Batch[Specimen],
-        out_process='processing_to_microtomy'
-    )
-    env.processes['processing_to_microtomy'] = DeliveryProcess(
+    env.processes['processing_to_microtomy'] = BatchDeliveryProcess(
         'processing_to_microtomy',
         env=env,
+        batch_size=env.batch_sizes.deliver_processing_to_microtomy,
         runner=env.resources.processing_room_staff,
         out_duration=env.minutes(2),
         return_duration=env.minutes(2),
@@ -128,14 +122,14 @@ def processing_start(self: Specimen) -> None:
     Else, send to queue assignment."""
     env: Model = self.env
     env.wips.in_processing.value += 1
-    env.specimen_data[self.name()]['processing_start'] = env.now()
+    env.specimen_data.set_time(self.row, 'processing_start', env.now())
 
     r = env.u01()
     if r < env.globals.prob_decalc_bone:
-        env.specimen_data[self.name()]['decalc_type'] = 'bone station'
+        env.specimen_data.set_value(self.row, 'decalc_type', 'bone station')
         out_queue = env.processes['batcher.decalc_bone_station'].in_queue
     elif r < env.globals.prob_decalc_bone + env.globals.prob_decalc_oven:
-        env.specimen_data[self.name()]['decalc_type'] = 'decalc oven'
+        env.specimen_data.set_value(self.row, 'decalc_type', 'decalc oven')
         out_queue = env.processes['decalc_oven'].in_queue
     else:
         out_queue = env.processes['processing_assign_queue'].in_queue
@@ -318,9 +312,9 @@ def post_processing(self: Specimen) -> None:
     env: Model = self.env
 
     env.wips.in_processing.value -= 1
-    env.specimen_data[self.name()]['processing_end'] = env.now()
+    env.specimen_data.set_time(self.row, 'processing_end', env.now())
 
     if self.prio == Priority.URGENT:
         self.enter_sorted(env.processes['processing_to_microtomy'].in_queue, Priority.URGENT)
     else:
-        self.enter(env.processes['batcher.processing_to_microtomy'].in_queue)
+        env.processes['processing_to_microtomy'].put(self)
@@ -3,7 +3,7 @@
 from typing import TYPE_CHECKING
 
 from ..specimens import Priority, Slide, Specimen
-from .__core import Batch, BatchingProcess, DeliveryProcess, Process
+from .__core import BatchDeliveryProcess, Process
 
 if TYPE_CHECKING:
     from ..model import Model
@@ -15,16 +15,10 @@ def register(env: 'Model') -> None:
     env.processes['microtomy'] = Process(
         'microtomy', env=env, in_type=Specimen, fn=microtomy
     )
-    env.processes['batcher.microtomy_to_staining'] = BatchingProcess(
-        'batcher.microtomy_to_staining',
-        env=env,
-        batch_size=env.batch_sizes.deliver_microtomy_to_staining,
-        out_type=Batch[Specimen],
-        out_process='microtomy_to_staining'
-    )
-    env.processes['microtomy_to_staining'] = DeliveryProcess(
+    env.processes['microtomy_to_staining'] = BatchDeliveryProcess(
         'microtomy_to_staining',
         env=env,
+        batch_size=env.batch_sizes.deliver_microtomy_to_staining,
         runner=env.resources.microtomy_staff,
         out_duration=env.minutes(2),
         return_duration=env.minutes(2),
@@ -36,8 +30,8 @@ def microtomy(self: Specimen) -> None:
     """Generate all slides for a specimen."""
     env: Model = self.env
     env.wips.in_microtomy.value += 1
-    env.specimen_data[self.name()]['microtomy_start'] = env.now()
-    env.specimen_data[self.name()]['total_slides'] = 0  # running total
+    env.specimen_data.set_time(self.row, 'microtomy_start', env.now())
+    total_slides = 0
 
     for block in self.blocks:
 
@@ -64,22 +58,18 @@ def microtomy(self: Specimen) -> None:
             num_slides = env.globals.num_slides_megas()
 
         for _ in range(num_slides):
-            slide = Slide(
-                f'{block.name()}.',
-                env=env,
-                parent=block,
-                slide_type=slide_type
-            )
+            slide = Slide(parent=block, slide_type=slide_type)
             block.slides.append(slide)
         block.data['num_slides'] = num_slides
-        env.specimen_data[self.name()]['total_slides'] += num_slides
+        total_slides += num_slides
 
         self.release()
 
     env.wips.in_microtomy.value -= 1
-    env.specimen_data[self.name()]['microtomy_end'] = env.now()
+    env.specimen_data.set_value(self.row, 'total_slides', total_slides)
+    env.specimen_data.set_time(self.row, 'microtomy_end', env.now())
 
     if self.prio == Priority.URGENT:
         self.enter_sorted(env.processes['microtomy_to_staining'].in_queue, Priority.URGENT)
     else:
-        self.enter(env.processes['batcher.microtomy_to_staining'].in_queue)
+        env.processes['microtomy_to_staining'].put(self)
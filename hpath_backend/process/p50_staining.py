@@ -3,8 +3,8 @@
 from typing import TYPE_CHECKING
 
 from ..specimens import Priority, Slide, Specimen
-from .__core import (Batch, BatchingProcess, CollationProcess, DeliveryProcess,
-                     Process)
+from .__core import (Batch, BatchDeliveryProcess, BatchingProcess,
+                     CollationProcess, Process)
 
 if TYPE_CHECKING:
     from ..model import Model
@@ -55,16 +55,10 @@ def register(env: 'Model') -> None:
     )
 
     # DELIVERY
-    env.processes['batcher.staining_to_labelling'] = BatchingProcess(
-        'batcher.staining_to_labelling',
-        env=env,
-        batch_size=env.batch_sizes.deliver_staining_to_labelling,
-        out_type=Batch[Specimen],
-        out_process='staining_to_labelling'
-    )
-    env.processes['staining_to_labelling'] = DeliveryProcess(
+    env.processes['staining_to_labelling'] = BatchDeliveryProcess(
         'staining_to_labelling',
         env=env,
+        batch_size=env.batch_sizes.deliver_staining_to_labelling,
         runner=env.resources.staining_staff,
         out_duration=env.minutes(2),
         return_duration=env.minutes(2),
@@ -76,14 +70,14 @@ def staining_start(self: Specimen) -> None:
     """Create a staining task for each individual slide."""
     env: Model = self.env
     env.wips.in_staining.value += 1
-    env.specimen_data[self.name()]['staining_start'] = env.now()
+    env.specimen_data.set_time(self.row, 'staining_start', env.now())
 
     for block in self.blocks:
         for slide in block.slides:
-            if slide.data['slide_type'] == 'megas':
-                slide.enter_sorted(env.processes['batcher.staining_megas'].in_queue, self.prio)
+            if slide.slide_type == 'megas':
+                env.processes['batcher.staining_megas'].put(slide, self.prio)
             else:
-                slide.enter_sorted(env.processes['batcher.staining_regular'].in_queue, self.prio)
+                env.processes['batcher.staining_regular'].put(slide, self.prio)
 
 
 def staining_regular(self: Batch[Slide]) -> None:
@@ -116,7 +110,7 @@ def staining_regular(self: Batch[Slide]) -> None:
     self.release()  # release all
 
     for slide in self.items:
-        slide.enter(env.processes['collate.staining.slides'].in_queue)
+        env.processes['collate.staining.slides'].put(slide)
 
 
 def staining_megas(self: Batch[Slide]) -> None:
@@ -140,7 +134,7 @@ def staining_megas(self: Batch[Slide]) -> None:
     for slide in self.items:
         # MANUAL COVERSLIPPING FOR MEGA SLIDES
         self.hold(env.task_durations.coverslip_megas)
-        slide.enter(env.processes['collate.staining.slides'].in_queue)
+        env.processes['collate.staining.slides'].put(slide)
 
     self.release()  # release all
 
@@ -150,9 +144,9 @@ def post_staining(self: Specimen) -> None:
     env: Model = self.env
 
     env.wips.in_staining.value -= 1
-    env.specimen_data[self.name()]['staining_end'] = env.now()
+    env.specimen_data.set_time(self.row, 'staining_end', env.now())
 
     if self.prio == Priority.URGENT:
         self.enter_sorted(env.processes['staining_to_labelling'].in_queue, Priority.URGENT)
     else:
-        self.enter(env.processes['batcher.staining_to_labelling'].in_queue)
+        env.processes['staining_to_labelling'].put(self)
@@ -3,7 +3,7 @@
 from typing import TYPE_CHECKING
 
 from ..specimens import Priority, Specimen
-from .__core import Batch, BatchingProcess, DeliveryProcess, Process
+from .__core import BatchDeliveryProcess, Process
 
 if TYPE_CHECKING:
     from ..model import Model
@@ -14,16 +14,10 @@ def register(env: "Model") -> None:
 
     # Labelling is done in the "main lab", i.e. microtomy
     env.processes['labelling'] = Process('labelling', env=env, in_type=Specimen, fn=labelling)
-    env.processes['batcher.labelling_to_scanning'] = BatchingProcess(
-        'batcher.labelling_to_scanning',
-        env=env,
-        batch_size=env.batch_sizes.deliver_labelling_to_scanning,
-        out_type=Batch[Specimen],
-        out_process='labelling_to_scanning'
-    )
-    env.processes['labelling_to_scanning'] = DeliveryProcess(
+    env.processes['labelling_to_scanning'] = BatchDeliveryProcess(
         'labelling_to_scanning',
         env=env,
+        batch_size=env.batch_sizes.deliver_labelling_to_scanning,
         runner=env.resources.microtomy_staff,
         out_duration=env.minutes(2),
         return_duration=env.minutes(2),
@@ -35,7 +29,7 @@ def labelling(self: Specimen) -> None:
     """Label all slides of a specimen."""
     env: Model = self.env
     env.wips.in_labelling.value += 1
-    env.specimen_data[self.name()]['labelling_start'] = env.now()
+    env.specimen_data.set_time(self.row, 'labelling_start', env.now())
 
     self.request((env.resources.microtomy_staff, 1, self. prio))
     for block in self.blocks:
@@ -44,9 +38,9 @@ def labelling(self: Specimen) -> None:
     self.release()
 
     env.wips.in_labelling.value -= 1
-    env.specimen_data[self.name()]['labelling_end'] = env.now()
+    env.specimen_data.set_time(self.row, 'labelling_end', env.now())
 
     if self.prio == Priority.URGENT:
         self.enter_sorted(env.processes['labelling_to_scanning'].in_queue, Priority.URGENT)
     else:
-        self.enter(env.processes['batcher.labelling_to_scanning'].in_queue)
+        env.processes['labelling_to_scanning'].put(self)
@@ -3,8 +3,8 @@
 from typing import TYPE_CHECKING
 
 from ..specimens import Slide, Specimen
-from .__core import (Batch, BatchingProcess, CollationProcess, DeliveryProcess,
-                     Process)
+from .__core import (Batch, BatchDeliveryProcess, BatchingProcess,
+                     CollationProcess, Process)
 
 if TYPE_CHECKING:
     from ..model import Model
@@ -54,16 +54,10 @@ def register(env: "Model") -> None:
     )
 
     # DELIVERY
-    env.processes['batcher.scanning_to_qc'] = BatchingProcess(
-        'batcher.scanning_to_qc',
-        env=env,
-        batch_size=env.batch_sizes.deliver_scanning_to_qc,
-        out_type=Batch[Specimen],
-        out_process='scanning_to_qc'
-    )
-    env.processes['scanning_to_qc'] = DeliveryProcess(
+    env.processes['scanning_to_qc'] = BatchDeliveryProcess(
         'scanning_to_qc',
         env=env,
+        batch_size=env.batch_sizes.deliver_scanning_to_qc,
         runner=env.resources.scanning_staff,
         out_duration=env.minutes(2),
         return_duration=env.minutes(2),
@@ -75,14 +69,14 @@ def scanning_start(self: Specimen) -> None:
     """Entry point for scanning."""
     env: Model = self.env
     env.wips.in_scanning.value += 1
-    env.specimen_data[self.name()]['scanning_start'] = env.now()
+    env.specimen_data.set_time(self.row, 'scanning_start', env.now())
 
     for block in self.blocks:
         for slide in block.slides:
-            if slide.data['slide_type'] == 'megas':
-                slide.enter(env.processes['batcher.scanning_megas'].in_queue)
+            if slide.slide_type == 'megas':
+                env.processes['batcher.scanning_megas'].put(slide)
             else:
-                slide.enter(env.processes['batcher.scanning_regular'].in_queue)
+                env.processes['batcher.scanning_regular'].put(slide)
 
 
 def scanning_regular(self: Batch[Slide]) -> None:
@@ -103,7 +97,7 @@ def scanning_regular(self: Batch[Slide]) -> None:
     self.release()
 
     for slide in self.items:
-        slide.enter(env.processes['collate.scanning.slides'].in_queue)
+        env.processes['collate.scanning.slides'].put(slide)
 
 
 def scanning_megas(self: Batch[Slide]) -> None:
@@ -124,12 +118,12 @@ def scanning_megas(self: Batch[Slide]) -> None:
     self.release()
 
     for slide in self.items:
-        slide.enter(env.processes['collate.scanning.slides'].in_queue)
+        env.processes['collate.scanning.slides'].put(slide)
 
 
 def post_scanning(self: Specimen) -> None:
     """Post-scanning tasks."""
     env: Model = self.env
     env.wips.in_scanning.value -= 1
-    env.specimen_data[self.name()]['scanning_end'] = env.now()
-    self.enter_sorted(env.processes['batcher.scanning_to_qc'].in_queue, self.prio)
+    env.specimen_data.set_time(self.row, 'scanning_end', env.now())
+    env.processes['scanning_to_qc'].put(self)
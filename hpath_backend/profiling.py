@@ -0,0 +1,135 @@
+"""Optional profiling of simulation models.
+
+When a :py:class:`~hpath_backend.model.Model` is created with ``profile=True``, a
+:py:class:`Profiler` is attached to it.  The profiler counts the calls of each process
+function registered by a :py:class:`~hpath_backend.process.Process` (e.g.
+``arrive_reception``, ``microtomy``, ``staining_regular``), and attributes the wall-clock
+time of each event-list step to the process function or component that ran in it.  As
+each step resumes a single component, time spent in simulated holds and in other
+components is not counted.
+
+When profiling is disabled, no wrappers are installed, so there is no runtime overhead.
+"""
+import functools
+import time
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
+
+import pydantic as pyd
+
+if TYPE_CHECKING:
+    from .model import Model
+
+
+class ProfileEntry(pyd.BaseModel):
+    """Profiling counters for a single process function or component."""
+
+    calls: int = 0
+    """Number of calls of the process function.  Always 0 for components."""
+
+    steps: int = 0
+    """Number of event-list steps in which the process function or component ran."""
+
+    wall_time: float = 0.0
+    """Total wall-clock time in seconds spent in these steps."""
+
+
+class Profile(pyd.BaseModel):
+    """Profiling results for a simulation run, or the sum over a number of runs."""
+
+    events: int = 0
+    """Total number of event-list steps."""
+
+    wall_time: float = 0.0
+    """Total wall-clock time in seconds spent in event-list steps."""
+
+    functions: dict[str, ProfileEntry] = pyd.Field(default_factory=dict)
+    """Counters for process functions registered to :py:class:`~hpath_backend.process.Process`
+    instances, keyed by process name."""
+
+    components: dict[str, ProfileEntry] = pyd.Field(default_factory=dict)
+    """Counters for other components.  Components in ``env.processes`` are keyed by name,
+    other components (e.g. specimens entering the model) by class name."""
+
+    @staticmethod
+    def from_profiles(profiles: list['Profile']) -> 'Profile':
+        """Sum the profiling results of multiple simulation runs."""
+        ret = __class__()
+        for profile in profiles:
+            ret.events += profile.events
+            ret.wall_time += profile.wall_time
+            for section, other in ((ret.functions, profile.functions),
+                                   (ret.components, profile.components)):
+                for key, entry in other.items():
+                    total = section.setdefault(key, ProfileEntry())
+                    total.calls += entry.calls
+                    total.steps += entry.steps
+                    total.wall_time += entry.wall_time
+        return ret
+
+
+class Profiler:
+    """Collects profiling counters for a simulation model.
+
+    Attributes:
+        env (Model): The profiled simulation model.
+        functions (dict[str, ProfileEntry]): Counters for registered process functions.
+        components (dict[str, ProfileEntry]): Counters for other components.
+    """
+
+    def __init__(self, env: 'Model') -> None:
+        self.env = env
+        self.functions: dict[str, ProfileEntry] = {}
+        self.components: dict[str, ProfileEntry] = {}
+        self.events = 0
+        self.wall_time = 0.0
+        self._returned: str | None = None
+        self._step = env.step
+        env.step = self.step
+
+    def wrap(self, name: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+        """Wrap a process function to count its calls.  The wrapper is named ``name``, so
+        that steps running the function are attributed to ``name``."""
+        entry = self.functions.setdefault(name, ProfileEntry())
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            entry.calls += 1
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                # salabim clears the process of a component once it terminates, so
+                # record the function name for the final step
+                self._returned = name
+
+        wrapper.__name__ = name
+        return wrapper
+
+    def step(self) -> None:
+        """Run and time the next step of the event list."""
+        start = time.perf_counter()
+        self._step()
+        elapsed = time.perf_counter() - start
+
+        comp = self.env._current_component  # pylint: disable=protected-access
+        fn_name, self._returned = self._returned, None
+        if fn_name is None:
+            fn_name = getattr(getattr(comp, '_process', None), '__name__', None)
+        if fn_name in self.functions:
+            entry = self.functions[fn_name]
+        else:
+            key = comp.name() if comp.name() in self.env.processes else type(comp).__name__
+            entry = self.components.setdefault(key, ProfileEntry())
+        entry.steps += 1
+        entry.wall_time += elapsed
+        self.events += 1
+        self.wall_time += elapsed
+
+    def profile(self) -> Profile:
+        """Return the profiling results so far."""
+        return Profile(
+            events=self.events,
+            wall_time=self.wall_time,
+            functions={key: entry.model_copy() for key, entry in self.functions.items()},
+            components={key: entry.model_copy() for key, entry in self.components.items()}
+        )
@@ -1,8 +1,18 @@
 """Defines a redis worker for the histopathology simulator."""
+import json
+import sqlite3 as sql
+
 import redis
-from rq import Queue, Worker
+from rq import Callback, Queue, Worker
+from rq.job import Dependency
 
-from conf import REDIS_HOST, REDIS_PORT
+from conf import REDIS_HOST, REDIS_PORT, SIM_FANOUT
+from .. import db
+from ..config import Config
+from ..simulate import (on_scenario_job_failure, rep_seeds, reduce_reps, simulate,
+                        simulate_rep_job)
+from ..types import HPathSharedParams
+from .parsing import parse_sc_data
 
 
 REDIS_CONN = redis.Redis(
@@ -14,10 +24,100 @@ REDIS_CONN = redis.Redis(
 HPATH_SIM_QUEUE = Queue(name='hpath', connection=REDIS_CONN, default_timeout=3600)
 """Redis queue for histopathology model simulation."""
 
+HPATH_PARSE_QUEUE = Queue(name='hpath-parse', connection=REDIS_CONN, default_timeout=600)
+"""Redis queue for parsing submissions.  Workers take jobs from this queue before the
+simulation queue, so that submissions are validated without waiting for queued
+simulations."""
+
+REP_RESULT_TTL = 7 * 24 * 3600
+"""Time in seconds to keep the results of replication jobs, if not collected by their
+reducer job."""
+
+
+def enqueue_scenario(config: Config, scenario_id: int, seed: int | None = None) -> None:
+    """Enqueue the simulation job(s) for a scenario.
+
+    If ``SIM_FANOUT`` is set, one job is enqueued for each replication, plus a dependent job
+    combining the replication results.  The dependent job also runs if some replication
+    jobs fail, so that the scenario can be marked as failed.  Otherwise, a single job runs
+    all replications.  Either way, the scenario is marked as failed if its final job fails.
+
+    Args:
+        config (Config): The scenario configuration.
+        scenario_id (int): The ID of the scenario.
+        seed (int | None):
+            The root seed from which the replication seeds are derived (see
+            :py:func:`~hpath_backend.simulate.rep_seeds`).  If None, a random root seed is
+            used.
+    """
+    on_failure = Callback(on_scenario_job_failure)
+    meta = {'scenario_id': scenario_id}
+    if not SIM_FANOUT:
+        HPATH_SIM_QUEUE.enqueue(simulate, config, scenario_id, seed,
+                                meta=meta, on_failure=on_failure)
+        return
+
+    rep_jobs = [
+        HPATH_SIM_QUEUE.enqueue(simulate_rep_job, config, scenario_id, rep_seed,
+                                result_ttl=REP_RESULT_TTL)
+        for rep_seed in rep_seeds(max(config.num_reps, 1), seed)
+    ]
+    HPATH_SIM_QUEUE.enqueue(reduce_reps, scenario_id, [job.id for job in rep_jobs],
+                            depends_on=Dependency(jobs=rep_jobs, allow_failure=True),
+                            meta=meta, on_failure=on_failure)
+
+
+def process_submission(submission_id: int) -> None:
+    """Parse and validate a raw upload stored by :py:func:`~hpath_backend.db.submit_upload`,
+    then create and enqueue its scenarios.  Intended to be run as a job.
+
+    Errors are saved to the submission's status.  Database and Redis errors are also
+    re-raised, failing the job; parse errors are not.  If enqueuing fails, the scenarios
+    created but not enqueued are marked as failed.  Does nothing if the submission has
+    already been submitted, e.g. if the job is run again.
+    """
+    raw_upload = db.get_upload(submission_id)
+    if raw_upload is None:  # Already submitted (the upload is dropped) or not found
+        return
+
+    db.set_submission_status(submission_id, 'parsing')
+    try:
+        upload = json.loads(raw_upload)
+        params = HPathSharedParams(**upload['params'])
+        configs = parse_sc_data(upload['scenarios'], params)
+    except sql.Error as exc:  # Database error, from the config cache
+        error = json.dumps({'type': str(type(exc)), 'msg': str(exc)})
+        db.set_submission_status(submission_id, 'failed', error)
+        raise
+    except Exception as exc:  # Parse error
+        error = json.dumps({'type': str(type(exc)), 'msg': str(exc)})
+        db.set_submission_status(submission_id, 'failed', error)
+        return
+
+    scenario_ids: list[int] = []
+    num_enqueued = 0
+    try:
+        scenario_ids = db.submit_scenarios(configs, params)
+        for config, scenario_id in zip(configs, scenario_ids):
+            enqueue_scenario(Config(**json.loads(config.config)), scenario_id)
+            num_enqueued += 1
+    except Exception as exc:  # Database or Redis error
+        for scenario_id in scenario_ids[num_enqueued:]:
+            db.fail_scenario(scenario_id, f'Failed to enqueue scenario: {exc}')
+        error = json.dumps({'type': str(type(exc)), 'msg': str(exc)})
+        db.set_submission_status(submission_id, 'failed', error)
+        raise
+    db.complete_submission(submission_id, scenario_ids)
+
+
+def enqueue_submission(submission_id: int) -> None:
+    """Enqueue the job parsing a submission and enqueuing its scenarios."""
+    HPATH_PARSE_QUEUE.enqueue(process_submission, submission_id)
+
 
 def start() -> None:
-    """Start an RQ worker on the default queue."""
-    worker = Worker(queues=[HPATH_SIM_QUEUE], connection=REDIS_CONN)
+    """Start an RQ worker on the parse and simulation queues, in that order of priority."""
+    worker = Worker(queues=[HPATH_PARSE_QUEUE, HPATH_SIM_QUEUE], connection=REDIS_CONN)
     worker.work(
         date_format="%d %b %Y %H:%M:%S",
         log_format="%(process)5d   %(asctime)s.%(msecs)03d %(message)s"
@@ -0,0 +1,103 @@
+"""Parsing and validation of scenario data submitted to the REST server."""
+import json
+import logging
+from base64 import b64decode
+from io import BytesIO
+
+import pandas as pd
+
+from .. import db
+from ..config import Config
+from ..excel import WorkbookReader
+from ..types import HPathConfigParams, HPathSharedParams
+
+logger = logging.getLogger(__name__)
+
+
+class ExcelException(Exception):
+    """Raised when openpyxl raises an error."""
+
+
+class ParseConfigError(Exception):
+    """Raised when parsing an openpyxl Workbook as a Config raises an error."""
+
+
+def parse_sc_data(sc_data: dict, params: HPathSharedParams) -> list[HPathConfigParams]:
+    """Parse and validate scenario data from REST request.
+
+    Parsed configs are cached by the SHA-256 hash of the uploaded file, so that parsing is
+    skipped if the same file is uploaded again.  Database errors from the config cache are
+    not parse errors, and are raised as-is.
+    """
+
+    sc_df = pd.DataFrame(sc_data)
+    configs: list[HPathConfigParams] = []
+
+    # LOAD AND PARSE EACH SCENARIO
+    for sc in sc_df.itertuples():
+        logger.info("%s. %s %s %s", sc.Index, sc.sc_name, sc.file_name, sc.decode_len_str)
+        sc_bytes = b64decode(sc.file_base64.split('base64,')[1])
+
+        # Use the cached config if the same file was parsed before
+        file_hash = db.hash_file(sc_bytes)
+        cached_config = db.get_cached_config(file_hash)
+        if cached_config is not None:
+            config_dict = json.loads(cached_config)
+            config_dict.update(sim_hours=params.sim_hours, num_reps=params.num_reps)
+            configs.append(HPathConfigParams(
+                name=sc.sc_name,
+                file_name=sc.file_name,
+                config=json.dumps(config_dict),
+                file=sc_bytes
+            ))
+            logger.info('OK! (cached)')
+            continue
+
+        # Try to load the xlsx file in openpyxl
+        try:
+            # Read-only, with formulas replaced by computed values
+            wbook = WorkbookReader(BytesIO(sc_bytes))
+        except Exception as exc:
+            logger.error(
+                'Error when reading "%s" (scenario "%s"): %s',
+                sc.file_name, sc.sc_name, str(exc)
+            )
+            raise ExcelException(
+                f"""\
+Error when reading {sc.file_name} (scenario {sc.sc_name}). \
+Is the file a valid Excel file?
+
+openpyxl error message:
+    {str(exc)}
+"""
+            ) from exc
+
+        # Validate the config
+        try:
+            config = Config.from_workbook(wbook, params.sim_hours, params.num_reps)
+            config_data = HPathConfigParams(
+                name=sc.sc_name,
+                file_name=sc.file_name,
+                config=config.model_dump_json(),
+                file=sc_bytes
+            )
+        except Exception as exc:
+            logger.error(
+                '    Error (type %s) when parsing "%s" (scenario "%s"): %s',
+                type(exc), sc.file_name, sc.sc_name, str(exc)
+            )
+            raise ParseConfigError(
+                f"""\
+Error (type {type(exc)}) when parsing “{sc.file_name}” (scenario: “{sc.sc_name}”): \
+    {str(exc)}
+"""
+            ) from exc
+        configs.append(config_data)
+        db.cache_config(file_hash, config_data.config)
+
+        logger.info('OK!')
+
+    logger.info('')
+    logger.info('')
+
+    return configs
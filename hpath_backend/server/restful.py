@@ -13,15 +13,22 @@ REST API
 +                                       +-----------------+-------------------------------------------------+
 |                                       | DELETE          | :py:func:`~hpath.restful.server.reset()`        |
 +---------------------------------------+-----------------+-------------------------------------------------+
-| ``/scenarios/``                       | POST            | :py:func:`~hpath.restful.server.new_scenario`   |
-|                                       +-----------------+-------------------------------------------------+
-|                                       | GET             | :py:func:`~hpath.restful.server.list_scenarios` |
+| ``/submit/``                          | POST            | :py:func:`~hpath.restful.server.new_scenario`   |
++---------------------------------------+-----------------+-------------------------------------------------+
+| ``/submissions/<submission_id>/``     | GET             | :py:func:`~hpath.restful.server.submission`     |
+| ``status/``                           |                 |                                                 |
++---------------------------------------+-----------------+-------------------------------------------------+
+| ``/scenarios/``                       | GET             | :py:func:`~hpath.restful.server.list_scenarios` |
++---------------------------------------+-----------------+-------------------------------------------------+
+| ``/scenarios/events``                 | GET             | :py:func:`~hpath.restful.server.stream_events`  |
 +---------------------------------------+-----------------+-------------------------------------------------+
 | ``/scenarios/<scenario_id>/status/``  | GET             | :py:func:`~hpath.restful.server.status`         |
 +---------------------------------------+-----------------+-------------------------------------------------+
 | ``/scenarios/<scenario_id>/results/`` | GET             | :py:func:`~hpath.restful.server.results`        |
 +---------------------------------------+-----------------+-------------------------------------------------+
-| ``/multi/``                           | POST            | :py:func:`~hpath.restful.server.new_multi`      |
+| ``/scenarios/<scenario_id>/report/``  | GET             | :py:func:`~hpath.restful.server.report`         |
++---------------------------------------+-----------------+-------------------------------------------------+
+| ``/multi/``                           | POST            | :py:func:`~hpath.restful.server.new_scenario`   |
 |                                       +-----------------+-------------------------------------------------+
 |                                       | GET             | :py:func:`~hpath.restful.server.list_multis`    |
 +---------------------------------------+-----------------+-------------------------------------------------+
@@ -34,23 +41,20 @@ REST API
   #pylint: enable=line-too-long
 """
 
-from base64 import b64decode
-from io import BytesIO
+from collections.abc import Iterator
 import json
 from http import HTTPStatus
+from typing import Any
 
+import redis
 from flask import Flask, Response, request
 from werkzeug.exceptions import HTTPException
 
-import pandas as pd
-import openpyxl as oxl
-
-from conf import PORT
-from hpath_backend.simulate import simulate
-from .. import db
-from ..config import Config
-from ..types import HPathConfigParams, HPathSharedParams
-from .job_queue import HPATH_SIM_QUEUE
+from conf import PORT, SSE_MAX_DURATION
+from .. import db, events
+from ..simulate import aggregate_analysis
+from ..types import HPathSharedParams
+from .job_queue import enqueue_submission
 
 app = Flask(__name__)
 
@@ -105,30 +109,55 @@ def clear() -> Response:
 
 
 @app.route('/submit/', methods=['POST'])
+@app.route('/multi/', methods=['POST'])
 def new_scenario() -> Response:
-    """Process POST request for creating a new scenario or multi-scenario analysis."""
-    sc_data: dict = request.json['scenarios']
-    params_dict: dict = request.json['params']
+    """Process POST request for creating a new scenario or multi-scenario analysis.
 
+    The raw upload is stored and a job is enqueued to parse it and enqueue its scenarios,
+    so the request returns without parsing the uploaded files.  Returns ``202 Accepted``
+    with the submission ID; parse errors are reported by the
+    ``/submissions/<submission_id>/status/`` endpoint.
+    """
     try:
-        params = HPathSharedParams(**params_dict)
-        configs = parse_sc_data(sc_data, params)
-    except Exception as exc:  # Parse error
+        HPathSharedParams(**request.json['params'])
+        request.json['scenarios']  # pylint: disable=pointless-statement
+    except Exception as exc:  # Malformed request
         return {'type': str(type(exc)), 'msg': str(exc)}, HTTPStatus.BAD_REQUEST
 
     try:
-        scenario_ids = db.submit_scenarios(configs, params)
+        submission_id = db.submit_upload(request.get_data())
     except Exception as exc:  # Database error
         return {'type': str(type(exc)), 'msg': str(exc)}, HTTPStatus.INTERNAL_SERVER_ERROR
 
     try:
-        for config, scenario_id in zip(configs, scenario_ids):
-            config_obj = Config(**json.loads(config.config))
-            HPATH_SIM_QUEUE.enqueue(simulate, config_obj, scenario_id)
+        enqueue_submission(submission_id)
     except Exception as exc:  # Redis error
-        return {'type': str(type(exc)), 'msg': str(exc)}, HTTPStatus.INTERNAL_SERVER_ERROR
+        error = {'type': str(type(exc)), 'msg': str(exc)}
+        db.set_submission_status(submission_id, 'failed', json.dumps(error))
+        return error, HTTPStatus.INTERNAL_SERVER_ERROR
+
+    status_url = f'/submissions/{submission_id}/status/'
+    return {'submission_id': submission_id, 'status_url': status_url}, HTTPStatus.ACCEPTED, \
+        {'Location': status_url}
 
-    return Response(status=HTTPStatus.OK)
+
+@app.route('/submissions/<submission_id>/status/')
+def status_submission(submission_id: int) -> Response:
+    """Process GET request for reading the status of a submission, including any errors
+    raised when parsing the submitted files."""
+    # Ensure submission_id is integer-compatible
+    try:
+        s_id = int(submission_id)
+    except ValueError as exc:
+        return {'type': str(type(exc)), 'msg': str(exc)}, HTTPStatus.NOT_FOUND
+
+    res = db.status_submission(s_id)
+    if res is None:
+        return {
+            'type': 'RowNotFoundError',
+            'msg': f"Cannot find submission with ID: '{submission_id}'."
+        }, HTTPStatus.NOT_FOUND
+    return res
 
 
 @app.route('/scenarios/')
@@ -138,14 +167,54 @@ def list_scenarios() -> Response:
     return scenarios.to_dict('records')
 
 
+@app.route('/scenarios/events')
+def stream_events() -> Response:
+    """Stream scenario progress and analysis completion events to the client as
+    server-sent events (``text/event-stream``), in place of polling ``/scenarios/``.
+
+    Streams are limited in number and duration (see
+    :py:class:`~hpath_backend.events.EventStream`).  Returns ``503 Service Unavailable`` if
+    too many streams are open or Redis is unavailable; the client should then poll
+    ``/scenarios/`` instead.  See :py:mod:`hpath_backend.events` for the event types.
+    """
+    try:
+        stream = events.EventStream()
+    except (events.StreamLimitError, redis.RedisError) as exc:
+        return {'type': str(type(exc)), 'msg': str(exc)}, HTTPStatus.SERVICE_UNAVAILABLE, \
+            {'Retry-After': str(int(SSE_MAX_DURATION))}
+
+    return Response(stream, mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+
+@app.route('/scenarios/<scenario_id>/status/')
+def status_scenario(scenario_id: int) -> Response:
+    """Process GET request for reading the progress of a scenario simulation."""
+    # Ensure scenario_id is integer-compatible
+    try:
+        s_id = int(scenario_id)
+    except ValueError as exc:
+        return {'type': str(type(exc)), 'msg': str(exc)}, HTTPStatus.NOT_FOUND
+
+    res = db.status_scenario(s_id)
+    if res.empty:
+        return {
+            'type': 'RowNotFoundError',
+            'msg': f"Cannot find scenario with ID: '{scenario_id}'."
+        }, HTTPStatus.NOT_FOUND
+
+    return res.to_dict('records')[0]
+
+
 @app.route('/scenarios/<scenario_id>/results/')
 def results_scenario(scenario_id: int) -> Response:
-    """Process GET request for reading a scenario simulation result."""
-    not_found_text = f"Cannot find results for scenario with ID: '{scenario_id}'."
-
-    class RowNotFoundError(Exception):
-        """Raised if a SQL SELECT statement returns zero rows."""
+    """Process GET request for reading a scenario simulation result.
 
+    Returns a list containing a single record, with the scenario status and the results
+    JSON as a string.  The stored results are decompressed and streamed in chunks.
+    """
     # Ensure scenario_id is integer-compatible
     try:
         s_id = int(scenario_id)
@@ -153,17 +222,91 @@ def results_scenario(scenario_id: int) -> Response:
         return {'type': str(type(exc)), 'msg': str(exc)}, HTTPStatus.NOT_FOUND
 
     # Fetch the scenario results
+    row = db.results_scenario(s_id)
+    if row is None:
+        return {
+            'type': 'RowNotFoundError',
+            'msg': f"Cannot find results for scenario with ID: '{scenario_id}'."
+        }, HTTPStatus.NOT_FOUND
+
+    return Response(stream_results_record(row), mimetype='application/json')
+
+
+@app.route('/scenarios/<scenario_id>/report/')
+def report_scenario(scenario_id: int) -> Response:
+    """Process GET request for reading a scenario simulation result as a
+    :py:class:`~hpath_backend.kpis.Report` JSON object.
+
+    The results are stored gzip-compressed, so they are sent as-is, with
+    ``Content-Encoding: gzip``, if the client accepts gzip encoding.  Otherwise, the
+    results are decompressed and streamed in chunks.
+    """
+    # Ensure scenario_id is integer-compatible
     try:
-        res = db.results_scenario(s_id)
-        if res.empty:
-            raise RowNotFoundError(not_found_text)
-    except AssertionError as exc:
+        s_id = int(scenario_id)
+    except ValueError as exc:
         return {'type': str(type(exc)), 'msg': str(exc)}, HTTPStatus.NOT_FOUND
 
-    return res.to_dict('records')
+    result = db.report_scenario(s_id)
+    if result is None:
+        return {
+            'type': 'RowNotFoundError',
+            'msg': f"Cannot find results for scenario with ID: '{scenario_id}'."
+        }, HTTPStatus.NOT_FOUND
+
+    return compressed_json_response(result)
+
+
+@app.route('/multi/')
+def list_analyses() -> Response:
+    """Return a list of multi-scenario analyses on the server, with their progress."""
+    return db.list_analyses()
+
+
+@app.route('/multi/<analysis_id>/status/')
+def status_analysis(analysis_id: int) -> Response:
+    """Process GET request for reading the progress of a multi-scenario analysis."""
+    # Ensure analysis_id is integer-compatible
+    try:
+        a_id = int(analysis_id)
+    except ValueError as exc:
+        return {'type': str(type(exc)), 'msg': str(exc)}, HTTPStatus.NOT_FOUND
+
+    res = db.status_analysis(a_id)
+    if res is None:
+        return {
+            'type': 'RowNotFoundError',
+            'msg': f"Cannot find analysis with ID: '{analysis_id}'."
+        }, HTTPStatus.NOT_FOUND
+    return res
+
+
+@app.route('/multi/<analysis_id>/results/')
+def results_analysis(analysis_id: int) -> Response:
+    """Process GET request for reading the aggregated results of a multi-scenario analysis.
 
+    The results are aggregated when the last scenario of the analysis completes, and served
+    from the database as for ``/scenarios/<scenario_id>/report/``.  If a completed analysis
+    has no aggregated results (e.g. if aggregation failed), they are computed and saved.
+    """
+    # Ensure analysis_id is integer-compatible
+    try:
+        a_id = int(analysis_id)
+    except ValueError as exc:
+        return {'type': str(type(exc)), 'msg': str(exc)}, HTTPStatus.NOT_FOUND
+
+    result = db.report_analysis(a_id)
+    if result is None:
+        status = db.status_analysis(a_id)
+        if status is None or status['completed'] is None:
+            return {
+                'type': 'RowNotFoundError',
+                'msg': f"Cannot find results for completed analysis with ID: '{analysis_id}'."
+            }, HTTPStatus.NOT_FOUND
+        aggregate_analysis(a_id)
+        result = db.report_analysis(a_id)
 
-# TODO remaining endpoints
+    return compressed_json_response(result)
 
 ######################################################################################
 ##                                                                                  ##
@@ -185,72 +328,34 @@ def results_scenario(scenario_id: int) -> Response:
 ##                                                                                  ##
 ######################################################################################
 
-class ExcelException(Exception):
-    """Raised when openpyxl raises an error."""
-
-
-class ParseConfigError(Exception):
-    """Raised when parsing an openpyxl Workbook as a Config raises an error."""
-
-
-def parse_sc_data(sc_data: dict, params: HPathSharedParams) -> list[HPathConfigParams]:
-    """Parse and validate scenario data from REST request."""
-
-    sc_df = pd.DataFrame(sc_data)
-    configs: list[HPathConfigParams] = []
-
-    # LOAD AND PARSE EACH SCENARIO
-    for sc in sc_df.itertuples():
-        app.logger.info("%s. %s %s %s", sc.Index, sc.sc_name, sc.file_name, sc.decode_len_str)
-        sc_bytes = b64decode(sc.file_base64.split('base64,')[1])
-
-        # Try to load the xlsx file in openpyxl
-        try:
-            # data_only: Replace formulas with computed values
-            wbook = oxl.load_workbook(BytesIO(sc_bytes), data_only=True)
-        except Exception as exc:
-            app.logger.error(
-                'Error when reading "%s" (scenario "%s"): %s',
-                sc.file_name, sc.sc_name, str(exc)
-            )
-            raise ExcelException(
-                f"""\
-Error when reading {sc.file_name} (scenario {sc.sc_name}). \
-Is the file a valid Excel file?
-
-openpyxl error message:
-    {str(exc)}
-"""
-            ) from exc
-
-        # Validate the config
-        try:
-            config = Config.from_workbook(wbook, params.sim_hours, params.num_reps)
-            config_data = HPathConfigParams(
-                name=sc.sc_name,
-                file_name=sc.file_name,
-                config=config.model_dump_json(),
-                file=sc_bytes
-            )
-            configs.append(config_data)
-        except Exception as exc:
-            app.logger.error(
-                '    Error (type %s) when parsing "%s" (scenario "%s"): %s',
-                type(exc), sc.file_name, sc.sc_name, str(exc)
-            )
-            raise ParseConfigError(
-                f"""\
-Error (type {type(exc)}) when parsing “{sc.file_name}” (scenario: “{sc.sc_name}”): \
-    {str(exc)}
-"""
-            ) from exc
+def compressed_json_response(result: bytes) -> Response:
+    """Build a response from gzip-compressed JSON stored in the database.  The stored bytes
+    are sent as-is if the client accepts gzip encoding, else they are decompressed and
+    streamed in chunks."""
+    if request.accept_encodings['gzip'] > 0:
+        response = Response(result, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(db.iter_result(result), mimetype='application/json')
+    response.vary.add('Accept-Encoding')
+    return response
 
-        app.logger.info('OK!')
 
-    app.logger.info('')
-    app.logger.info('')
+def stream_results_record(row: dict[str, Any]) -> Iterator[str]:
+    """Stream a scenario results row as a JSON list containing a single record.  The
+    compressed ``results`` field is decompressed in chunks and encoded as a JSON string,
+    without holding the full results JSON in memory."""
+    row = dict(row)
+    result = row.pop('results')
+    yield '[' + json.dumps(row)[:-1] + (', ' if row else '') + '"results": '
+    if result is None:
+        yield 'null}]'
+        return
+    yield '"'
+    for chunk in db.iter_result(result):
+        yield json.dumps(chunk)[1:-1]  # escape as JSON string contents
+    yield '"}]'
 
-    return configs
 
 ##########################################
 ##                                      ##
@@ -265,6 +370,7 @@ Error (type {type(exc)}) when parsing “{sc.file_name}” (scenario: “{sc.sc_
 ##########################################
 
 
+# Development server only, see hpath_backend.server.wsgi for production
 if __name__ == '__main__':
     db.init()
     app.run(host='0.0.0.0', port=PORT, debug=True)
@@ -0,0 +1,78 @@
+"""Production entry point for the REST server.
+
+Serves :py:data:`hpath_backend.server.restful.app` using gunicorn, with ``SERVER_WORKERS``
+worker processes of ``SERVER_THREADS`` threads each.  The app, and so ``hpath_backend`` and
+its dependencies, is imported once before the workers are forked.  The database is
+initialised once on startup, and each worker opens its own database connection after
+forking.
+
+Usage (from the repository root)::
+
+    python -m hpath_backend.server.wsgi [--workers N] [--threads N] [--bind HOST:PORT]
+"""
+import argparse
+import os
+from typing import Any
+
+from gunicorn.app.base import BaseApplication
+from gunicorn.arbiter import Arbiter
+from gunicorn.workers.base import Worker
+
+from conf import PORT, SERVER_THREADS, SERVER_WORKERS
+from .. import db
+
+
+def on_starting(_server: Arbiter) -> None:
+    """Initialise the database once, before the workers are forked."""
+    db.init()
+    db.disconnect()
+
+
+def post_fork(_server: Arbiter, _worker: Worker) -> None:
+    """Open a database connection for the new worker process."""
+    db.connect()
+
+
+class HPathApplication(BaseApplication):
+    """Gunicorn application serving the REST server.
+
+    Attributes:
+        options (dict[str, Any]): Gunicorn settings, see
+            https://docs.gunicorn.org/en/stable/settings.html.
+    """
+
+    def __init__(self, options: dict[str, Any] | None = None) -> None:
+        self.options = {
+            'bind': f'0.0.0.0:{PORT}',
+            'workers': SERVER_WORKERS or 2 * (os.cpu_count() or 1) + 1,
+            'threads': SERVER_THREADS,
+            'worker_class': 'gthread',
+            'preload_app': True,
+            'on_starting': on_starting,
+            'post_fork': post_fork,
+            **(options or {})
+        }
+        super().__init__()
+
+    def load_config(self) -> None:
+        for key, value in self.options.items():
+            if key in self.cfg.settings and value is not None:
+                self.cfg.set(key.lower(), value)
+
+    def load(self):
+        from .restful import app  # pylint: disable=import-outside-toplevel
+        return app
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the production REST server."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n', maxsplit=1)[0])
+    parser.add_argument('--workers', type=int, help='Number of worker processes.')
+    parser.add_argument('--threads', type=int, help='Number of threads per worker.')
+    parser.add_argument('--bind', help=f'Address to bind to (default: 0.0.0.0:{PORT}).')
+    args = parser.parse_args(argv)
+    HPathApplication({key: val for key, val in vars(args).items() if val is not None}).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,168 @@
 """Module containing the main simulation entry point for histopathology model
 configurations."""
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from rq import get_current_job
+from rq.job import Job, JobStatus
+
+from conf import SIM_MAX_WORKERS, SIM_PROFILE
 from .config import Config
-from .kpis import Report
+from .kpis import Report, multi_report
 from .model import Model
-from . import db
+from . import db, events
+
+logger = logging.getLogger(__name__)
+
 
+def rep_seeds(num_reps: int, seed: int | None = None) -> list[int]:
+    """Generate an independent random seed for each simulation replication.
 
-def simulate(config: Config, scenario_id: int):
-    """Run a simulation and update the hpath simulation database."""
-    print(f"SIM: id={scenario_id}, sim_hours={config.sim_hours}")
-    model = Model(config)
+    Args:
+        num_reps (int): The number of simulation replications.
+        seed (int | None):
+            The root seed from which the replication seeds are derived.  If None, a random
+            root seed is used.
+    """
+    children = np.random.SeedSequence(seed).spawn(num_reps)
+    return [int(child.generate_state(1)[0]) for child in children]
+
+
+def simulate_rep(config: Config, seed: int) -> Report:
+    """Run a single simulation replication with the given random seed and return its KPIs."""
+    model = Model(config, random_seed=seed, profile=SIM_PROFILE)
     model.run()
-    report_json = Report.from_model(model).model_dump_json()
+    return Report.from_model(model)
+
+
+def simulate(config: Config, scenario_id: int, seed: int | None = None):
+    """Run a simulation and update the hpath simulation database.
+
+    The ``config.num_reps`` replications are run in parallel in a process pool, each with
+    its own random seed, and the KPIs of each replication are combined into a single
+    :py:class:`~hpath_backend.kpis.Report`.  Progress, with the KPIs of the replications
+    completed so far, is written to the database as replications complete and published as a
+    progress event (see :py:mod:`hpath_backend.events`).
+    """
+    print(f"SIM: id={scenario_id}, sim_hours={config.sim_hours}, num_reps={config.num_reps}")
+    seeds = rep_seeds(max(config.num_reps, 1), seed)
+    max_workers = min(len(seeds), SIM_MAX_WORKERS or os.cpu_count() or 1)
+    reports: list[Report] = []
+
+    def interim_result() -> str:
+        return Report.from_reports(reports).model_dump_json()
+
+    def rep_done(report: Report) -> None:
+        reports.append(report)
+        progress.add(1, interim_result if len(reports) < len(seeds) else None)
+
+    with db.ProgressWriter(scenario_id, on_flush=events.publish_scenario) as progress:
+        if max_workers == 1:
+            for rep_seed in seeds:
+                rep_done(simulate_rep(config, rep_seed))
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(simulate_rep, config, rep_seed) for rep_seed in seeds]
+                for future in as_completed(futures):
+                    rep_done(future.result())
+
+    report_json = Report.from_reports(reports).model_dump_json()
+    save_result(scenario_id, report_json)
+
+
+def simulate_rep_job(config: Config, scenario_id: int, seed: int) -> Report:
+    """Run a single simulation replication as a standalone job and increment the progress
+    counter of its scenario.  Returns the KPIs of the replication, to be combined by
+    :py:func:`reduce_reps`.
+
+    The report is returned as an object, pickled by RQ, rather than as JSON, since JSON
+    serialisation turns NaN KPIs (e.g. when no specimen completes a stage) into nulls that
+    fail validation.
+    """
+    print(f"SIM: id={scenario_id}, sim_hours={config.sim_hours}, seed={seed}")
+    report = simulate_rep(config, seed)
     db.update_progress(scenario_id)
-    db.save_result(scenario_id, report_json)
+    events.publish_scenario(scenario_id)
+    return report
+
+
+def reduce_reps(scenario_id: int, rep_job_ids: list[str]) -> None:
+    """Combine the results of the :py:func:`simulate_rep_job` jobs of a scenario and update
+    the hpath simulation database.  Must be run as a job depending on all replication jobs,
+    allowing failures.
+
+    If any replication job has not finished (e.g. it failed, was stopped or cancelled, or
+    has expired), the scenario is marked as failed instead.  The unfinished jobs are kept
+    for inspection.
+    """
+    connection = get_current_job().connection
+    rep_jobs = Job.fetch_many(rep_job_ids, connection=connection)
+    failed = [(job_id, job) for job_id, job in zip(rep_job_ids, rep_jobs)
+              if job is None or job.get_status() != JobStatus.FINISHED]
+    if failed:
+        job_id, job = failed[0]
+        fail_scenario(scenario_id, f'{len(failed)} of {len(rep_jobs)} replication jobs failed, '
+                                   f'first failure ({job_id}): {rep_failure_reason(job)}')
+        for job in rep_jobs:
+            if job is not None and job.get_status() == JobStatus.FINISHED:
+                job.delete()
+        return
+
+    reports = [job.return_value() for job in rep_jobs]
+    save_result(scenario_id, Report.from_reports(reports).model_dump_json())
+    for job in rep_jobs:
+        job.delete()
+
+
+def rep_failure_reason(job: Job | None) -> str:
+    """Describe why a replication job did not finish, for the error message of its scenario.
+
+    Args:
+        job (Job | None): The replication job, or None if it has expired or been deleted.
+    """
+    if job is None:
+        return 'job expired'
+    reason = f'job {job.get_status().value}'
+    latest = job.latest_result()
+    if latest is not None and latest.exc_string:
+        reason += f': {latest.exc_string.strip().splitlines()[-1]}'
+    return reason
+
+
+def fail_scenario(scenario_id: int, error: str) -> None:
+    """Record that the simulation of a scenario has failed."""
+    db.fail_scenario(scenario_id, error)
+    events.publish_scenario(scenario_id)
+
+
+def on_scenario_job_failure(job: Job, connection, exc_type, exc_value, traceback) -> None:
+    """RQ failure callback for jobs simulating a whole scenario, i.e. :py:func:`simulate` and
+    :py:func:`reduce_reps` jobs.  The scenario ID is read from ``job.meta['scenario_id']``."""
+    # pylint: disable=unused-argument
+    fail_scenario(job.meta['scenario_id'], f'{exc_type.__name__}: {exc_value}')
+
+
+def save_result(scenario_id: int, report_json: str) -> None:
+    """Save the results of a scenario.  If this completes a multi-scenario analysis, also
+    compute and save the analysis's aggregated results.
+
+    Errors when aggregating are logged, not raised, as the scenario is already completed.
+    The aggregated results are then computed when first requested instead.
+    """
+    analysis_id = db.save_result(scenario_id, report_json)
+    events.publish_scenario(scenario_id)
+    if analysis_id is not None:
+        try:
+            aggregate_analysis(analysis_id)
+        except Exception:  # Aggregation error
+            logger.exception('Failed to aggregate the results of analysis %s', analysis_id)
+        events.publish_analysis(analysis_id)
+
+
+def aggregate_analysis(analysis_id: int) -> None:
+    """Compute and save the aggregated results of a completed multi-scenario analysis."""
+    result_json = json.dumps(multi_report(db.results_analysis_scenarios(analysis_id)))
+    db.save_analysis_result(analysis_id, result_json)
@@ -0,0 +1,252 @@
+"""Columnar storage of specimen data for the simulation model.
+
+Specimen data is held as a structure of arrays, with one row per specimen.  Each specimen
+stores its integer row index, and stage timestamps are stored in fixed float64 columns by
+:py:meth:`SpecimenData.set_time`.  For the KPI computations and interactive use, a
+dict-like view of each row is provided by :py:class:`SpecimenRecord`, so that
+``model.specimen_data['specimen.123']['cutup_start']`` works as for a dict of dicts.
+"""
+from collections.abc import Iterator, Mapping, MutableMapping
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from .specimens import Priority
+
+if TYPE_CHECKING:
+    from .trace import TraceSink
+
+STAGES = ('reception', 'cutup', 'processing', 'microtomy', 'staining',
+          'labelling', 'scanning', 'qc', 'report')
+"""Histopathology stages with ``<stage>_start`` and ``<stage>_end`` timestamps in the
+specimen data, in process order."""
+
+TIMESTAMPS = tuple(f'{stage}_{event}' for stage in STAGES for event in ('start', 'end'))
+"""Names of the timestamp columns of the specimen data."""
+
+CATEGORIES: dict[str, tuple[str, ...]] = {
+    'source': ('Internal', 'External'),
+    'priority': tuple(prio.name for prio in Priority),
+    'cutup_type': ('BMS', 'Pool', 'Large specimens'),
+    'decalc_type': ('bone station', 'decalc oven')
+}
+"""Categorical columns of the specimen data and their allowed values.  Values are stored
+as integer codes indexing into these tuples."""
+
+_CODES = {key: {val: code for code, val in enumerate(vals)} for key, vals in CATEGORIES.items()}
+
+_COLUMNS: dict[str, tuple[str, type, Any]] = {
+    **{key: ('time', np.float64, np.nan) for key in TIMESTAMPS},
+    'cancer': ('bool', np.int8, -1),
+    'num_blocks': ('int', np.int32, -1),
+    'total_slides': ('int', np.int32, -1),
+    **{key: ('category', np.int8, -1) for key in CATEGORIES}
+}
+"""Kind, dtype, and unset value of each column of the specimen data."""
+
+
+class SpecimenData(Mapping[str, 'SpecimenRecord']):
+    """Structure-of-arrays store for the data of all specimens in a model.
+
+    Rows are appended as specimens are created, and the arrays grow geometrically as
+    needed.  Keys without a dedicated column, such as the ``bootstrap`` data of mock
+    specimens, are kept in a sparse per-row dict.  As a :py:class:`~collections.abc.Mapping`,
+    the store maps specimen names to :py:class:`SpecimenRecord` views.
+
+    If ``keep_times`` is false, timestamps set with :py:meth:`set_time` are only appended to
+    the trace sink, and the rows of completed specimens are reused (see
+    :py:meth:`complete`).  The store then only grows with the number of specimens in
+    progress, but cannot be used to compute KPIs.
+
+    Attributes:
+        columns (dict[str, numpy.ndarray]):
+            The data columns.  Only the first ``num_rows`` rows are valid.
+        names (list[str | None]): The specimen name of each row, or None for a free row.
+        specimen_id (numpy.ndarray): Integer specimen IDs, e.g. 123 for ``specimen.123``.
+        mock (numpy.ndarray): Boolean array, true for mock (bootstrap) specimens.
+        sink (hpath_backend.trace.TraceSink | None):
+            If set, timestamps of non-mock specimens are also appended to this trace sink.
+        keep_times (bool):
+            If false, timestamps set with :py:meth:`set_time` are not stored in the
+            ``columns``, and rows are released on completion.  Only useful with a ``sink``.
+    """
+
+    def __init__(self, capacity: int = 1024) -> None:
+        self._size = 0
+        self._capacity = capacity
+        self._rows: dict[str, int] = {}
+        self._extras: dict[int, dict[str, Any]] = {}
+        self._free: list[int] = []
+        self.names: list[str | None] = []
+        self.columns = {key: np.full(capacity, fill, dtype=dtype)
+                        for key, (_, dtype, fill) in _COLUMNS.items()}
+        self.specimen_id = np.zeros(capacity, dtype=np.int64)
+        self.mock = np.zeros(capacity, dtype=bool)
+        self.sink: 'TraceSink | None' = None
+        self.keep_times = True
+
+    @property
+    def num_rows(self) -> int:
+        """The number of rows in use or released, i.e. the valid length of the columns."""
+        return self._size
+
+    def _grow(self) -> None:
+        """Double the capacity of the store."""
+        new_capacity = 2 * self._capacity
+        for key, (_, dtype, fill) in _COLUMNS.items():
+            col = np.full(new_capacity, fill, dtype=dtype)
+            col[:self._size] = self.columns[key][:self._size]
+            self.columns[key] = col
+        self.specimen_id = np.resize(self.specimen_id, new_capacity)
+        self.mock = np.resize(self.mock, new_capacity)
+        self._capacity = new_capacity
+
+    def add(self, name: str, **kwargs) -> int:
+        """Add a row for the specimen with the given name, setting any values given as
+        keyword arguments.  Returns the index of the new row, which may be a released row
+        (see :py:meth:`complete`)."""
+        if self._free:
+            row = self._free.pop()
+            self.names[row] = name
+        else:
+            if self._size == self._capacity:
+                self._grow()
+            row = self._size
+            self._size += 1
+            self.names.append(name)
+        self._rows[name] = row
+        # specimen.123 -> 123
+        self.specimen_id[row] = int(name.rsplit('.', 1)[1])
+        self.mock[row] = 'init' in name
+        for key, value in kwargs.items():
+            self.set_value(row, key, value)
+        return row
+
+    def set_value(self, row: int, key: str, value: Any) -> None:
+        """Set the value of ``key`` for the specimen at ``row``."""
+        col = _COLUMNS.get(key)
+        if col is None:
+            self._extras.setdefault(row, {})[key] = value
+        elif col[0] == 'category':
+            self.columns[key][row] = _CODES[key][value]
+        else:
+            self.columns[key][row] = value
+            if self.sink is not None and col[0] == 'time' and not self.mock[row]:
+                self.sink.append(int(self.specimen_id[row]), key, value,
+                                 int(self.columns['priority'][row]))
+
+    def set_time(self, row: int, key: str, time: float) -> None:
+        """Set the timestamp ``key`` (one of :py:data:`TIMESTAMPS`) for the specimen at
+        ``row``.  Fast path for stage transitions, skipping the column lookup and kind
+        dispatch of :py:meth:`set_value`."""
+        if self.keep_times:
+            self.columns[key][row] = time
+        if self.sink is not None and not self.mock[row]:
+            self.sink.append(int(self.specimen_id[row]), key, time,
+                             int(self.columns['priority'][row]))
+
+    def complete(self, row: int) -> None:
+        """Mark the specimen at ``row`` as completed.  If timestamps are not kept in memory,
+        the row is released for reuse by a new specimen; the specimen's
+        :py:class:`SpecimenRecord` must not be used afterwards."""
+        if self.keep_times:
+            return
+        del self._rows[self.names[row]]
+        self.names[row] = None
+        self._extras.pop(row, None)
+        for key, (_, _, fill) in _COLUMNS.items():
+            self.columns[key][row] = fill
+        self._free.append(row)
+
+    def get_value(self, row: int, key: str) -> Any:
+        """Get the value of ``key`` for the specimen at ``row``.
+
+        Raises:
+            KeyError: If the value is not set.
+        """
+        col = _COLUMNS.get(key)
+        if col is None:
+            try:
+                return self._extras[row][key]
+            except KeyError:
+                raise KeyError(key) from None
+        value = self.columns[key][row]
+        kind = col[0]
+        if kind == 'time':
+            if np.isnan(value):
+                raise KeyError(key)
+            return float(value)
+        if value == -1:
+            raise KeyError(key)
+        if kind == 'category':
+            return CATEGORIES[key][value]
+        return bool(value) if kind == 'bool' else int(value)
+
+    def unset_value(self, row: int, key: str) -> None:
+        """Unset the value of ``key`` for the specimen at ``row``."""
+        self.get_value(row, key)  # raise KeyError if not set
+        col = _COLUMNS.get(key)
+        if col is None:
+            del self._extras[row][key]
+        else:
+            self.columns[key][row] = col[2]
+
+    def row_keys(self, row: int) -> list[str]:
+        """Return the keys with values set for the specimen at ``row``."""
+        keys = [key for key, (kind, _, _) in _COLUMNS.items()
+                if not (np.isnan(self.columns[key][row]) if kind == 'time'
+                        else self.columns[key][row] == -1)]
+        return keys + list(self._extras.get(row, {}))
+
+    def column(self, key: str) -> np.ndarray:
+        """Return a view of the valid rows of a data column."""
+        return self.columns[key][:self._size]
+
+    def record(self, row: int) -> 'SpecimenRecord':
+        """Return a dict-like view of the row with the given index."""
+        return SpecimenRecord(self, row)
+
+    def to_dict(self) -> dict[str, dict[str, Any]]:
+        """Convert the store to a dict of dicts, e.g. for JSON serialisation."""
+        return {name: dict(self.record(row)) for name, row in self._rows.items()}
+
+    def __getitem__(self, name: str) -> 'SpecimenRecord':
+        return SpecimenRecord(self, self._rows[name])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+
+class SpecimenRecord(MutableMapping[str, Any]):
+    """Dict-like view of the data of a single specimen in a :py:class:`SpecimenData` store.
+
+    Attributes:
+        store (SpecimenData): The store containing the specimen data.
+        row (int): The row index of the specimen in the store.
+    """
+    __slots__ = ('store', 'row')
+
+    def __init__(self, store: SpecimenData, row: int) -> None:
+        self.store = store
+        self.row = row
+
+    def __getitem__(self, key: str) -> Any:
+        return self.store.get_value(self.row, key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.store.set_value(self.row, key, value)
+
+    def __delitem__(self, key: str) -> None:
+        self.store.unset_value(self.row, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.store.row_keys(self.row))
+
+    def __len__(self) -> int:
+        return len(self.store.row_keys(self.row))
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
@@ -1,6 +1,7 @@
 """Defines specimens, blocks, and slides."""
 import enum
 from abc import ABC
+from collections.abc import MutableMapping
 from typing import TYPE_CHECKING, Any, Generic, Self, TypeVar
 
 import salabim as sim
@@ -23,49 +24,49 @@ class Component(sim.Component, ABC):
     Attribute:
         prio (Priority): Priority of the component (Urgent, Priority, Cancer, or Routine).
         parent (Component): The parent component, if it exists.
-        data (dict[str, Any]): Properites of the component.
+        data (MutableMapping[str, Any]): Properites of the component.
+        pending (int):
+            Number of child entities yet to arrive at the current
+            :py:class:`~hpath_backend.process.CollationProcess`, or 0 if not being collated.
     """
     prio: Priority
     parent: Self | None
-    data: dict[str, Any]
+    data: MutableMapping[str, Any]
+    pending: int = 0
 
 
-C = TypeVar('C', bound=Component)
+C = TypeVar('C', bound='Component | Slide')
 
 
 class Specimen(Component):
-    """A tissue specimen."""
+    """A tissue specimen.
+
+    Process functions write to ``env.specimen_data`` by row index, e.g. with
+    :py:meth:`~hpath_backend.specimen_data.SpecimenData.set_time`, rather than through
+    ``data``.
+
+    Attributes:
+        row (int): Row index of the specimen in ``env.specimen_data``.
+        data (hpath_backend.specimen_data.SpecimenRecord):
+            Dict-like view of the specimen's row in ``env.specimen_data``.
+        source (str): The source of the specimen, "Internal" or "External".
+    """
 
     def setup(self, **kwargs) -> None:
         """Set up the `Specimen`. Salabim encourages use of a ``setup()`` method
         rather than overriding ``__init__()``. The method is called automatically
         immediately after initialisation."""
         env: Model = self.env
-        env.specimen_data[self.name()] = kwargs
+        self.row = env.specimen_data.add(self.name(), **kwargs)
+        self.data = env.specimen_data.record(self.row)
         self.blocks: list[Block] = []
 
-        dist = 'cancer' if env.specimen_data[self.name()]['cancer'] else 'non_cancer'
-
-        env.specimen_data[self.name()]['source'] = sim.CumPdf(
-            (
-                "Internal", env.globals.prob_internal,
-                "External", 1
-            ),
-            env=env
-        ).sample()
+        dist = 'cancer' if kwargs['cancer'] else 'non_cancer'
 
-        self.prio: Priority = sim.CumPdf((
-            Priority.URGENT,
-            getattr(env.globals, 'prob_urgent_' + dist),
-
-            Priority.PRIORITY,
-            getattr(env.globals, 'prob_urgent_' + dist) +
-            getattr(env.globals, 'prob_priority_' + dist),
-
-            (Priority.CANCER if dist == "cancer" else Priority.ROUTINE),
-            1,
-        ), env=env).sample()
-        env.specimen_data[self.name()]['priority'] = self.prio.name
+        self.source: str = env.source_dist()
+        env.specimen_data.set_value(self.row, 'source', self.source)
+        self.prio: Priority = env.priority_dists[dist]()
+        env.specimen_data.set_value(self.row, 'priority', self.prio.name)
 
     def process(self) -> None:
         """Insert specimen into the `in_queue` of its first process."""
@@ -86,16 +87,28 @@ class Block(Component):
         self.data = kwargs
 
 
-class Slide(Component):
-    """A glass slide."""
+class Slide:
+    """A glass slide.
 
-    def setup(self, *, parent: Block, **kwargs) -> None:  # pylint: disable=arguments-differ
-        """Set up the `Slide`. Salabim encourages use of a ``setup()`` method
-        rather than overriding ``__init__()``. The method is called automatically
-        immediately after initialisation."""
-        self.parent: Block = parent
-        self.prio = self.parent.prio
-        self.data = kwargs
+    Slides never run a process of their own and are only passed between batching and
+    collation processes (see :py:meth:`hpath_backend.process.BatchingProcess.put` and
+    :py:meth:`hpath_backend.process.CollationProcess.put`), so they are lightweight
+    objects rather than salabim components.
+
+    Attributes:
+        parent (Block): The block the slide was cut from.
+        prio (Priority): Priority of the slide, inherited from its block.
+        slide_type (str): The slide type ("levels", "serials", "larges", or "megas").
+    """
+    __slots__ = ('parent', 'prio', 'slide_type')
+
+    def __init__(self, *, parent: Block, slide_type: str) -> None:
+        self.parent = parent
+        self.prio = parent.prio
+        self.slide_type = slide_type
+
+    def __repr__(self) -> str:
+        return f'Slide({self.parent.name()}, {self.slide_type})'
 
 
 class Batch(Component, Generic[C]):
@@ -0,0 +1,148 @@
+"""Optional streaming of specimen stage events to an Arrow IPC or Parquet file.
+
+When a :py:class:`~hpath_backend.model.Model` is created with ``trace_path=<path>``, every
+stage timestamp recorded in the model's
+:py:class:`~hpath_backend.specimen_data.SpecimenData` is also appended to a
+:py:class:`TraceSink` as a ``(specimen_id, stage, event, t, priority)`` row.  Rows are
+buffered in fixed-size record batches, which are written to the file as the simulation
+runs.  Timestamps of mock (bootstrap) specimens are not traced.
+
+With ``trace_only=True``, the timestamps are not also kept in memory, and completed
+specimens are dropped, so memory use stays flat on long simulation horizons.  KPIs must
+then be computed from the trace file.
+
+Tracing requires :py:mod:`pyarrow`, which is an optional dependency.
+"""
+import os
+from typing import TYPE_CHECKING, Self
+
+import numpy as np
+
+from .specimen_data import CATEGORIES, STAGES
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+TRACE_BATCH_SIZE = 65536
+"""Default number of rows in each record batch written to the trace file."""
+
+EVENTS = ('start', 'end')
+"""Event types in the trace, i.e. the start or end of a stage."""
+
+TRACE_CODES: dict[str, tuple[int, int]] = {
+    f'{stage}_{event}': (stage_code, event_code)
+    for stage_code, stage in enumerate(STAGES)
+    for event_code, event in enumerate(EVENTS)
+}
+"""Maps timestamp names (e.g. ``cutup_start``) to ``(stage, event)`` codes."""
+
+
+class TraceSink:
+    """Buffers stage events in fixed-size record batches and writes them to an Arrow IPC
+    file, or a Parquet file if the path ends with ``.parquet``.
+
+    The ``stage``, ``event`` and ``priority`` columns are dictionary-encoded.
+
+    Attributes:
+        path (str): Path of the output file.
+        batch_size (int): Number of rows in each record batch.
+    """
+
+    def __init__(self, path: str | os.PathLike, batch_size: int = TRACE_BATCH_SIZE) -> None:
+        try:
+            import pyarrow as pa  # pylint: disable=import-outside-toplevel
+        except ImportError as err:
+            raise ImportError('Tracing requires the optional pyarrow package.') from err
+        self._pa = pa
+
+        self.path = os.fspath(path)
+        self.batch_size = batch_size
+        self._size = 0
+        self._specimen_id = np.empty(batch_size, dtype=np.int64)
+        self._stage = np.empty(batch_size, dtype=np.int8)
+        self._event = np.empty(batch_size, dtype=np.int8)
+        self._t = np.empty(batch_size, dtype=np.float64)
+        self._priority = np.empty(batch_size, dtype=np.int8)
+
+        dict_type = pa.dictionary(pa.int8(), pa.string())
+        self.schema = pa.schema([
+            ('specimen_id', pa.int64()),
+            ('stage', dict_type),
+            ('event', dict_type),
+            ('t', pa.float64()),
+            ('priority', dict_type)
+        ])
+        self._dictionaries = {
+            'stage': pa.array(STAGES),
+            'event': pa.array(EVENTS),
+            'priority': pa.array(CATEGORIES['priority'])
+        }
+
+        if self.path.endswith('.parquet'):
+            import pyarrow.parquet as pq  # pylint: disable=import-outside-toplevel
+            self._writer = pq.ParquetWriter(self.path, self.schema)
+        else:
+            self._writer = pa.ipc.new_file(self.path, self.schema)
+
+    def append(self, specimen_id: int, key: str, t: float, priority: int) -> None:
+        """Append a stage event to the trace.
+
+        Args:
+            specimen_id (int): Integer ID of the specimen.
+            key (str): Name of the timestamp, e.g. ``cutup_start``.
+            t (float): Simulation time of the event.
+            priority (int): Priority code of the specimen, indexing ``CATEGORIES['priority']``.
+
+        Raises:
+            ValueError: If the sink is closed.
+        """
+        if self._writer is None:
+            raise ValueError(f'Cannot append to closed trace sink: {self.path}')
+        idx = self._size
+        self._specimen_id[idx] = specimen_id
+        self._stage[idx], self._event[idx] = TRACE_CODES[key]
+        self._t[idx] = t
+        self._priority[idx] = priority
+        self._size += 1
+        if self._size == self.batch_size:
+            self.flush()
+
+    def _record_batch(self) -> 'pa.RecordBatch':
+        """Build a record batch from the buffered rows."""
+        pa = self._pa
+        num_rows = self._size
+
+        def dict_array(name: str, codes: np.ndarray) -> 'pa.DictionaryArray':
+            return pa.DictionaryArray.from_arrays(codes[:num_rows].copy(), self._dictionaries[name])
+
+        return pa.RecordBatch.from_arrays([
+            pa.array(self._specimen_id[:num_rows].copy()),
+            dict_array('stage', self._stage),
+            dict_array('event', self._event),
+            pa.array(self._t[:num_rows].copy()),
+            dict_array('priority', self._priority)
+        ], schema=self.schema)
+
+    def flush(self) -> None:
+        """Write the buffered rows to the file as a record batch."""
+        if self._size > 0:
+            self._writer.write_batch(self._record_batch())
+            self._size = 0
+
+    @property
+    def closed(self) -> bool:
+        """True if the trace file has been closed."""
+        return self._writer is None
+
+    def close(self) -> None:
+        """Flush the remaining rows and close the file."""
+        if self._writer is not None:
+            self.flush()
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()